@@ -16,20 +16,15 @@ sys.path.insert(0, HERE)
 
 import cv2
 import numpy as np
-import mediapipe as mp
 from pose_extractor import OptimizedMediaPipePoseExtractor
 
 # Path to your test video
 VIDEO_PATH = '/media/sayad/Ubuntu-Data/SilentVoice_BD/dataset/bdslw60/archive/balu/U1W220F_trial_3_R.mp4'
 
 def main():
-    # 1) Initialize extractor and MediaPipe Holistic
+    # 1) Initialize extractor; its Holistic graph is reused below
     extractor = OptimizedMediaPipePoseExtractor()
-    holistic = mp.solutions.holistic.Holistic(
-        static_image_mode=False,
-        min_detection_confidence=0.5,
-        min_tracking_confidence=0.5
-    )
+    holistic = extractor.holistic
 
     # 2) Read the first frame of the video
     cap = cv2.VideoCapture(VIDEO_PATH)
@@ -42,7 +37,6 @@ def main():
     # 3) Run Holistic to get landmarks
     rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
     results = holistic.process(rgb)
-    holistic.close()
 
     # 4) Extract raw features (288-dim vector)
     raw = extractor.extract_keypoints(results)
@@ -59,5 +53,7 @@ def main():
     print(f"Raw features:  mean = {raw.mean():.6f}, std = {raw.std():.6f}")
     print(f"Norm features: mean = {norm.mean():.6f}, std = {norm.std():.6f}")
 
+    extractor.close()
+
 if __name__ == "__main__":
     main()
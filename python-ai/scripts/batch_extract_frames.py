@@ -1,4 +1,8 @@
 import os
+
+# Multi-threaded FFmpeg decoding; must be set before OpenCV opens any capture
+os.environ.setdefault('OPENCV_FFMPEG_CAPTURE_OPTIONS', 'threads;auto')
+
 import cv2
 
 # Path to your dataset
@@ -11,7 +15,9 @@ MAX_FRAMES_PER_VIDEO = 30
 
 def extract_frames_from_video(video_path, output_dir, max_frames=30):
     os.makedirs(output_dir, exist_ok=True)
-    cap = cv2.VideoCapture(video_path)
+    cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG)
+    if hasattr(cv2, 'CAP_PROP_N_THREADS'):
+        cap.set(cv2.CAP_PROP_N_THREADS, os.cpu_count() or 4)
     frame_count = 0
     while cap.isOpened() and frame_count < max_frames:
         ret, frame = cap.read()
@@ -23,10 +29,10 @@ def extract_frames_from_video(video_path, output_dir, max_frames=30):
     cap.release()
 
 def main():
-    for label in os.listdir(DATASET_DIR):
-        label_dir = os.path.join(DATASET_DIR, label)
-        if not os.path.isdir(label_dir):
-            continue
+    # scandir reports the entry type from the listing itself (no stat() per label)
+    with os.scandir(DATASET_DIR) as entries:
+        label_dirs = [(entry.name, entry.path) for entry in entries if entry.is_dir()]
+    for label, label_dir in label_dirs:
         for video_file in os.listdir(label_dir):
             if not video_file.lower().endswith(('.mp4', '.avi', '.mov', '.mkv')):
                 continue
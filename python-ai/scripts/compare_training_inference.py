@@ -1,13 +1,14 @@
-import json
 import numpy as np
 import sys
 sys.path.append('.')
 from pose_extractor import extract_pose_landmarks
+from prepare_training_data import load_training_data
+
+TRAINING_DATA_PATH = 'python-ai/data/training_data.json'
 
 def analyze_training_data():
     print("Analyzing training data...")
-    with open('python-ai/data/training_data.json', 'r') as f:
-        training_data = json.load(f)
+    training_data = load_training_data(TRAINING_DATA_PATH)
     X = training_data['X']
     y = training_data['y']
     print(f"Training data samples: {len(X)}")
@@ -34,8 +35,7 @@ def compare_with_inference(test_video_path):
     print(f"  Mean: {inference_landmarks.mean():.6f}")
     print(f"  Std: {inference_landmarks.std():.6f}")
     # Load training data for comparison
-    with open('python-ai/data/training_data.json', 'r') as f:
-        training_data = json.load(f)
+    training_data = load_training_data(TRAINING_DATA_PATH)
     X = training_data['X']
     training_sample = np.array(X[0])
     print(f"\nComparison:")
@@ -1,24 +1,15 @@
 #!/usr/bin/env python3
 import cv2
 import numpy as np
-import mediapipe as mp
 from pose_extractor import OptimizedMediaPipePoseExtractor
 
 VIDEO_PATH = '/media/sayad/Ubuntu-Data/SilentVoice_BD/dataset/bdslw60/archive/balu/U1W220F_trial_3_R.mp4'
 
-# Match your extractor defaults
-MIN_DETECTION_CONFIDENCE = 0.5
-MIN_TRACKING_CONFIDENCE  = 0.5
-
 def diagnose(video_path):
     cap = cv2.VideoCapture(video_path)
     extractor = OptimizedMediaPipePoseExtractor()
-    mp_holistic = mp.solutions.holistic
-    holistic = mp_holistic.Holistic(
-        static_image_mode=False,
-        min_detection_confidence=MIN_DETECTION_CONFIDENCE,
-        min_tracking_confidence=MIN_TRACKING_CONFIDENCE
-    )
+    # Reuse the extractor's own graph (same settings as extraction) instead of loading a second one
+    holistic = extractor.holistic
 
     print("Frame │ Nonzero Feats │ Avg Feature │ Det Conf │ Track Conf")
     print("──────┼───────────────┼─────────────┼──────────┼───────────")
@@ -50,7 +41,7 @@ def diagnose(video_path):
 
         frame_idx += 1
 
-    holistic.close()
+    extractor.close()
     cap.release()
 
 if __name__ == "__main__":
@@ -133,8 +133,7 @@ def test_normalization_files():
     
     files_to_check = [
         "../data/feature_means.npy",
-        "../data/feature_stds.npy",
-        "../data/normalization_params.json"
+        "../data/feature_stds.npy"
     ]
     
     all_files_ok = True
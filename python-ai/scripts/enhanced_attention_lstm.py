@@ -16,6 +16,7 @@ import optuna
 from optuna.integration import TFKerasPruningCallback
 import gc
 import logging
+from prepare_training_data import load_training_data
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -120,8 +121,7 @@ class EnhancedAttentionTrainer:
         logger.info("Loading training data for attention model...")
         
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_training_data(self.data_file)
         except FileNotFoundError:
             raise FileNotFoundError(f"Training data file not found: {self.data_file}")
         
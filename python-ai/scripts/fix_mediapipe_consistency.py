@@ -5,6 +5,7 @@ import cv2
 import mediapipe as mp
 import numpy as np
 import logging
+from landmark_packing import pack_all
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,6 +23,12 @@ class FixedMediaPipePoseExtractor:
             min_detection_confidence=0.7,  # Higher threshold
             min_tracking_confidence=0.7
         )
+        # RGB conversion target, reallocated only when the frame size changes
+        self._rgb_buf = None
+        # Feature buffer with left hand / right hand / pose / face views, refilled every frame
+        self._feature_buf = np.zeros(288, dtype=np.float32)
+        self._views = (self._feature_buf[:63].reshape(21, 3), self._feature_buf[63:126].reshape(21, 3),
+                       self._feature_buf[126:258].reshape(33, 4), self._feature_buf[258:288].reshape(10, 3))
     
     def extract_consistent_features(self, image_path):
         """Extract features with consistent preprocessing"""
@@ -38,8 +45,11 @@ class FixedMediaPipePoseExtractor:
             new_w, new_h = int(w * scale), int(h * scale)
             image = cv2.resize(image, (new_w, new_h))
         
-        # Convert BGR to RGB
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        # Convert BGR to RGB into the reused buffer
+        if self._rgb_buf is None or self._rgb_buf.shape != image.shape:
+            self._rgb_buf = np.empty(image.shape, dtype=np.uint8)
+        self._rgb_buf.flags.writeable = True
+        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
         rgb_image.flags.writeable = False
         
         # Process with MediaPipe
@@ -51,48 +61,13 @@ class FixedMediaPipePoseExtractor:
         return features
     
     def _extract_288_features(self, results):
-        """Extract exactly 288 features to match training"""
+        """Extract exactly 288 features to match training
         
-        features = []
-        
-        # Left hand (21 * 3 = 63 features)
-        if results.left_hand_landmarks:
-            for landmark in results.left_hand_landmarks.landmark:
-                features.extend([landmark.x, landmark.y, landmark.z])
-        else:
-            features.extend([0.0] * 63)
-        
-        # Right hand (21 * 3 = 63 features)  
-        if results.right_hand_landmarks:
-            for landmark in results.right_hand_landmarks.landmark:
-                features.extend([landmark.x, landmark.y, landmark.z])
-        else:
-            features.extend([0.0] * 63)
-        
-        # Pose (33 * 4 = 132 features)
-        if results.pose_landmarks:
-            for landmark in results.pose_landmarks.landmark:
-                features.extend([landmark.x, landmark.y, landmark.z, landmark.visibility])
-        else:
-            features.extend([0.0] * 132)
-        
-        # Face (10 * 3 = 30 features)  
-        if results.face_landmarks and len(results.face_landmarks.landmark) >= 10:
-            for i in range(10):
-                landmark = results.face_landmarks.landmark[i]
-                features.extend([landmark.x, landmark.y, landmark.z])
-        else:
-            features.extend([0.0] * 30)
-        
-        # Ensure exactly 288 features
-        if len(features) != 288:
-            logger.warning(f"Feature count mismatch: {len(features)} != 288")
-            if len(features) < 288:
-                features.extend([0.0] * (288 - len(features)))
-            else:
-                features = features[:288]
-        
-        return np.array(features, dtype=np.float32)
+        Same layout as pose_extractor (left hand 63, right hand 63, pose 132 with
+        visibility, face 30), packed straight from the protobuf wire format.
+        """
+        pack_all(results, self._views)
+        return self._feature_buf.copy()
 
 def test_fixed_extraction(video_path):
     """Test the fixed extraction on your dongshon video"""
@@ -104,7 +79,9 @@ def test_fixed_extraction(video_path):
         print(f"❌ Cannot open video: {video_path}")
         return
     
-    sequences = []
+    # Rows never filled stay zero, which is the 30-frame padding
+    sequences = np.zeros((30, 288), dtype=np.float32)
+    valid_frames = 0
     frame_count = 0
     
     # Extract exactly 30 frames
@@ -124,7 +101,8 @@ def test_fixed_extraction(video_path):
         # Extract features
         features = extractor.extract_consistent_features(temp_path)
         if features is not None:
-            sequences.append(features.tolist())
+            sequences[valid_frames] = features
+            valid_frames += 1
         
         # Cleanup
         os.remove(temp_path)
@@ -132,15 +110,8 @@ def test_fixed_extraction(video_path):
     
     cap.release()
     
-    if len(sequences) < 30:
-        # Pad with zeros if needed
-        while len(sequences) < 30:
-            sequences.append([0.0] * 288)
-    
-    sequences = sequences[:30]  # Ensure exactly 30 frames
-    
     print(f"✅ Extracted {len(sequences)} sequences")
-    print(f"   Feature range: [{np.array(sequences).min():.6f}, {np.array(sequences).max():.6f}]")
+    print(f"   Feature range: [{sequences.min():.6f}, {sequences.max():.6f}]")
     
     return sequences
 
@@ -151,6 +122,6 @@ if __name__ == "__main__":
         
         # Save for testing
         with open('fixed_dongshon_features.json', 'w') as f:
-            json.dump({'sequences': sequences}, f)
+            json.dump({'sequences': None if sequences is None else sequences.tolist()}, f)
         
         print("✅ Fixed features saved to 'fixed_dongshon_features.json'")
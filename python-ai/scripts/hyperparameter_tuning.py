@@ -16,6 +16,8 @@ import optuna
 from optuna.integration import TFKerasPruningCallback
 import gc
 import logging
+from model_trainer import export_tflite_models
+from prepare_training_data import load_training_data
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -38,8 +40,7 @@ class BanglaSignHyperparameterTuner:
         logger.info("Loading training data...")
         
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_training_data(self.data_file)
         except FileNotFoundError:
             raise FileNotFoundError(f"Training data file not found: {self.data_file}")
         
@@ -272,6 +273,10 @@ class BanglaSignHyperparameterTuner:
         # Save final model
         model.save('../trained_models/hypertuned_bangla_lstm_final.h5')
         
+        # Quantized variants named after the best checkpoint, as live_stream_processor.py expects;
+        # restore_best_weights leaves the checkpointed weights in model
+        export_tflite_models(model, '../trained_models/hypertuned_bangla_lstm_best.h5', self.X_train)
+        
         # Save label encoder
         with open('../trained_models/hypertuned_label_encoder.pkl', 'wb') as f:
             pickle.dump(self.label_encoder, f)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+MediaPipe landmark packing into flat float32 feature buffers
+- pack_landmarks: x, y, z[, visibility] of one landmark list, read from its protobuf wire bytes
+- pack_all: left hand, right hand, pose and face groups of one Holistic result
+Depends on NumPy only, so the extractors can share it without importing each other
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+# Wire tags of NormalizedLandmark x, y, z, visibility (field number << 3 | fixed32)
+_LANDMARK_TAGS = np.array([(field << 3) | 5 for field in range(1, 5)], dtype=np.uint8)
+
+
+def pack_landmarks(landmark_list, out: np.ndarray):
+    """Copy x, y, z[, visibility] of the first len(out) landmarks into out
+    
+    NormalizedLandmarkList serializes as fixed-size records: a 0x0A tag and length
+    byte, then one (tag, float32) pair per field. The wire bytes are viewed as a
+    (count, stride) uint8 array and the floats gathered without per-landmark Python
+    attribute access. Falls back to the attribute loop if the layout differs.
+    """
+    n_rows, n_cols = out.shape
+    # Tasks API landmarks are plain dataclasses with no wire format
+    if not hasattr(landmark_list, 'SerializeToString'):
+        wire = b''
+    else:
+        wire = landmark_list.SerializeToString()
+    count = len(landmark_list.landmark)
+    if count >= n_rows and len(wire) > 1 and wire[1] % 5 == 0 and wire[1] < 128:
+        n_fields = wire[1] // 5
+        stride = wire[1] + 2
+        if n_fields >= n_cols and len(wire) == count * stride:
+            rows = np.frombuffer(wire, dtype=np.uint8).reshape(count, stride)[:n_rows]
+            fields = rows[:, 2:].reshape(n_rows, n_fields, 5)
+            # Fields 1..n_cols in order, every field fixed32, same layout in every record
+            if ((rows[:, 0] == 0x0A).all() and (rows[:, 1] == wire[1]).all()
+                    and (fields[:, :n_cols, 0] == _LANDMARK_TAGS[:n_cols]).all()
+                    and (fields[:, :, 0] & 0x07 == 5).all()):
+                out[:] = np.ascontiguousarray(fields[:, :n_cols, 1:]).view('<f4')[..., 0]
+                return
+    
+    out.fill(0.0)
+    for row, lm in zip(out, landmark_list.landmark):
+        row[:] = (lm.x, lm.y, lm.z, lm.visibility or 0.0)[:n_cols]
+
+
+def pack_all(results, views: Tuple[np.ndarray, ...]) -> Tuple[float, float, float, float]:
+    """Pack the left hand, right hand, pose and face landmarks into their views of one buffer
+    
+    Layout: left hand 21 x 3, right hand 21 x 3, pose 33 x 4 (with visibility), face 10 x 3.
+    Every view is overwritten: absent groups are zeroed and score 0.0, so the buffer needs
+    no clearing between frames. Face landmarks count only when at least 10 are present.
+    Returns the (left hand, right hand, pose, face) qualities.
+    """
+    lh_view, rh_view, pose_view, face_view = views
+    left_hand = results.left_hand_landmarks
+    right_hand = results.right_hand_landmarks
+    pose = results.pose_landmarks
+    face = results.face_landmarks
+    
+    face_present = bool(face) and len(face.landmark) >= len(face_view)
+    for landmarks, view in ((left_hand, lh_view), (right_hand, rh_view), (pose, pose_view)):
+        if landmarks:
+            pack_landmarks(landmarks, view)
+        else:
+            view.fill(0.0)
+    if face_present:
+        pack_landmarks(face, face_view)
+    else:
+        face_view.fill(0.0)
+    
+    return (1.0 if left_hand else 0.0,
+            1.0 if right_hand else 0.0,
+            float(pose_view[:, 3].mean()) if pose else 0.0,
+            1.0 if face_present else 0.0)
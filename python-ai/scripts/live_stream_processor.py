@@ -1,64 +1,267 @@
+import os
 import sys
 import json
+import time
+import queue
+import socket
+import struct
+import signal
 import argparse
+import threading
+from concurrent.futures import Future
 import cv2
 import numpy as np
 from pathlib import Path
 import tensorflow as tf
 from tensorflow import keras
-import pickle
 
 # Add the parent directory to the path
 sys.path.append(str(Path(__file__).parent))
 
 # Import your existing modules
-from pose_extractor import extract_pose_landmarks
-from sign_predictor import SignPredictor
+from pose_extractor import OptimizedMediaPipePoseExtractor
+
+# libjpeg-turbo decoder is optional; cv2.imread is used without it
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+    TURBOJPEG_AVAILABLE = True
+except ImportError:
+    TURBOJPEG_AVAILABLE = False
+
+# MessagePack is optional; the socket server can fall back to JSON payloads
+try:
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    MSGPACK_AVAILABLE = False
 
 class LiveStreamProcessor:
-    def __init__(self):
+    def __init__(self, max_batch=16, batch_window_ms=8, batching=True):
         self.model_path = "../trained_models/hypertuned_bangla_lstm_best.h5"
-        self.label_encoder_path = "../trained_models/hypertuned_label_encoder.pkl"
         self.model_config_path = "../trained_models/hypertuned_model_config.json"
         
+        # Quantized variants written next to the model by model_trainer.export_tflite_models
+        # (Edge TPU file from edgetpu_compiler)
+        model_stem = Path(self.model_path).with_suffix('')
+        self.tflite_fp16_path = f"{model_stem}_fp16.tflite"
+        self.tflite_int8_path = f"{model_stem}_int8.tflite"
+        self.tflite_edgetpu_path = f"{model_stem}_int8_edgetpu.tflite"
+        
         # Load model and encoder
         self.load_model_and_encoder()
+        self.interpreter = self.load_tflite_interpreter()
+        
+        # One tracking-mode MediaPipe graph per session (created on its first frame), so
+        # interleaved sessions never inherit each other's landmarks
+        self.pose_extractors = {}
+        
+        # Socket clients are served on their own threads; a session's frames are processed
+        # one at a time under its lock (its window and tracking graph are stateful)
+        self._session_locks = {}
+        self._session_locks_guard = threading.Lock()
+        
+        self.jpeg = None
+        if TURBOJPEG_AVAILABLE:
+            try:
+                self.jpeg = TurboJPEG()
+            except Exception:
+                self.jpeg = None
         
-        # Initialize predictor
-        self.predictor = SignPredictor(
-            model_path=self.model_path,
-            label_encoder_path=self.label_encoder_path,
-            config_path=self.model_config_path
-        )
+        # Normalization statistics saved by model_trainer.py
+        self.load_normalization_params()
         
         # Frame sequence for LSTM (30 frames as per your training)
         self.sequence_length = 30
-        self.frame_sequences = {}  # Store sequences per session
+        self.feature_dim = self.config.get('feature_dim', 288)
+        self.frame_sequences = {}  # Raw (sequence_length, feature_dim) window per session
+        self.frame_counts = {}
+        self._infer = self._build_inference_fn()
+        
+        # Near-duplicate gate: reuse a confident prediction while the pose barely moves
+        self.duplicate_epsilon = 0.05
+        self.duplicate_min_confidence = 0.9
+        self.last_landmarks = {}  # Raw frame at the last model invocation
+        self.last_prediction = {}
+        
+        # Ready sequences from concurrent socket connections are coalesced into one batched
+        # model call; the one-shot CLI has a single caller and runs the model inline
+        self.max_batch = max_batch
+        self.batch_window = batch_window_ms / 1000.0
+        self._pending = queue.Queue()
+        self._batch_thread = None
+        if batching:
+            self._batch_thread = threading.Thread(target=self._batch_worker, daemon=True)
+            self._batch_thread.start()
         
     def load_model_and_encoder(self):
-        """Load the trained model and label encoder"""
+        """Load the trained model and the index -> class lookup"""
         try:
             self.model = keras.models.load_model(self.model_path)
             
-            with open(self.label_encoder_path, 'rb') as f:
-                self.label_encoder = pickle.load(f)
-                
-            with open(self.model_config_path, 'r') as f:
+            with open(self.model_config_path, 'r', encoding='utf-8') as f:
                 self.config = json.load(f)
+            
+            # hyperparameter_tuning.py stores the model's LabelEncoder classes_ in index order
+            self.index_to_class = tuple(self.config['classes'])
                 
         except Exception as e:
             raise Exception(f"Failed to load model: {str(e)}")
 
+    def load_tflite_interpreter(self):
+        """Pick the fastest available variant: Edge TPU, then GPU delegate, then CPU int8"""
+        candidates = [
+            (self.tflite_edgetpu_path, 'libedgetpu.so.1'),
+            (self.tflite_fp16_path, 'libtensorflowlite_gpu_delegate.so'),
+            (self.tflite_int8_path, None),
+        ]
+        for model_path, delegate_lib in candidates:
+            if not Path(model_path).exists():
+                continue
+            try:
+                delegates = [tf.lite.experimental.load_delegate(delegate_lib)] if delegate_lib else []
+                interpreter = tf.lite.Interpreter(model_path=model_path, experimental_delegates=delegates)
+                interpreter.allocate_tensors()
+                self.inference_backend = f"{Path(model_path).name} ({delegate_lib or 'cpu'})"
+                return interpreter
+            except Exception:
+                continue
+        
+        # No usable TFLite variant: fall back to the Keras model
+        self.inference_backend = "keras"
+        return None
+
+    def _build_inference_fn(self):
+        """Trace reshape + normalization + the Keras forward pass as one XLA-compiled graph"""
+        means = tf.constant(self.feature_means)
+        stds = tf.constant(self.feature_stds)
+        
+        @tf.function(input_signature=[
+            tf.TensorSpec([None, self.sequence_length * self.feature_dim], tf.float32)
+        ], jit_compile=True)
+        def _infer(flat):
+            x = tf.reshape(flat, (-1, self.sequence_length, self.feature_dim))
+            x = (x - means) / stds
+            return self.model(x, training=False)
+        return _infer
+
+    def _run_model(self, batch):
+        """Run a (N, sequence_length, feature_dim) batch and return the softmax rows"""
+        if self.interpreter is None:
+            return self._infer(tf.constant(batch.reshape(len(batch), -1))).numpy()
+        
+        # The TFLite graph has no normalization op, so apply it here, in place on the
+        # freshly stacked float32 batch
+        np.subtract(batch, self.feature_means, out=batch)
+        np.multiply(batch, self.feature_inv_stds, out=batch)
+        
+        input_detail = self.interpreter.get_input_details()[0]
+        if input_detail['shape'][0] != len(batch):
+            self.interpreter.resize_tensor_input(input_detail['index'], batch.shape)
+            self.interpreter.allocate_tensors()
+            input_detail = self.interpreter.get_input_details()[0]
+        output_detail = self.interpreter.get_output_details()[0]
+        
+        if input_detail['dtype'] == np.int8:
+            scale, zero_point = input_detail['quantization']
+            batch = np.clip(np.round(batch / scale + zero_point), -128, 127).astype(np.int8)
+        
+        self.interpreter.set_tensor(input_detail['index'], batch)
+        self.interpreter.invoke()
+        probs = self.interpreter.get_tensor(output_detail['index'])
+        
+        if output_detail['dtype'] == np.int8:
+            scale, zero_point = output_detail['quantization']
+            probs = (probs.astype(np.float32) - zero_point) * scale
+        return probs
+
+    def load_normalization_params(self):
+        """Load float32 feature means/stds once for the inference graph"""
+        try:
+            self.feature_means = np.load("../data/feature_means.npy").astype(np.float32)
+            self.feature_stds = np.load("../data/feature_stds.npy").astype(np.float32)
+            self.feature_stds[self.feature_stds == 0] = 1.0
+            # Multiply by the float32 reciprocal instead of dividing every element
+            self.feature_inv_stds = (1.0 / self.feature_stds).astype(np.float32)
+        except Exception as e:
+            raise Exception(f"Failed to load normalization parameters: {str(e)}")
+
+    def _batch_worker(self):
+        """Drain pending sequences and run them through the model as one batch"""
+        while True:
+            batch = [self._pending.get()]
+            # Only hold the batch open when other sequences are already waiting; those
+            # pile up from other connections while the previous batch runs
+            deadline = time.monotonic() + self.batch_window
+            while len(batch) < self.max_batch and self._pending.qsize() > 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            futures = [future for _, _, future in batch]
+            try:
+                stacked = np.stack([sequence for _, sequence, _ in batch])
+                probs = self._run_model(stacked)
+                for future, row in zip(futures, probs):
+                    future.set_result(row)
+            except Exception as e:
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _submit_sequence(self, session_id, sequence):
+        """Queue a (sequence_length, features) array for batched inference"""
+        future = Future()
+        self._pending.put((session_id, sequence, future))
+        return future
+
+    def _predict(self, session_id, sequence):
+        """Softmax row for one sequence, through the batch worker when batching is on"""
+        if self._batch_thread is None:
+            return self._run_model(sequence[np.newaxis])[0]
+        return self._submit_sequence(session_id, sequence).result()
+
+    def _read_image(self, image_path):
+        """Decode a frame, using libjpeg-turbo's SIMD decoder for JPEGs when available"""
+        if self.jpeg is not None:
+            try:
+                with open(image_path, 'rb') as f:
+                    return self.jpeg.decode(f.read(), pixel_format=TJPF_BGR)
+            except Exception:
+                pass  # Not a JPEG (e.g. PNG) - let OpenCV handle it
+        return cv2.imread(image_path)
+
+    def _session_lock(self, session_id):
+        """Lock serializing the frames of one session"""
+        with self._session_locks_guard:
+            lock = self._session_locks.get(session_id)
+            if lock is None:
+                lock = self._session_locks[session_id] = threading.Lock()
+            return lock
+
     def process_single_frame(self, image_path, session_id):
-        """Process a single frame and return prediction"""
+        """Process a single frame and return prediction (thread-safe across sessions)"""
+        with self._session_lock(session_id):
+            return self._process_single_frame(image_path, session_id)
+
+    def _process_single_frame(self, image_path, session_id):
+        """Process a single frame and return prediction; the caller holds the session lock"""
         try:
             # Read image
-            image = cv2.imread(image_path)
+            image = self._read_image(image_path)
             if image is None:
                 return {"error": True, "message": "Could not read image"}
             
-            # Extract pose landmarks using your existing method
-            landmarks = extract_pose_landmarks(image)
+            # Extract pose landmarks with the session's extractor, built with the legacy
+            # settings (complexity 0, confidence 0.5) the training data was extracted with
+            extractor = self.pose_extractors.get(session_id)
+            if extractor is None:
+                extractor = OptimizedMediaPipePoseExtractor(skip_normalization_loading=True)
+                self.pose_extractors[session_id] = extractor
+            landmarks = extractor.extract_landmarks(image)
             
             if landmarks is None:
                 return {
@@ -70,32 +273,41 @@ class LiveStreamProcessor:
             
             # Initialize session sequence if not exists
             if session_id not in self.frame_sequences:
-                self.frame_sequences[session_id] = []
+                self.frame_sequences[session_id] = np.zeros((self.sequence_length, self.feature_dim), dtype=np.float32)
+                self.frame_counts[session_id] = 0
             
-            # Add current frame landmarks to sequence
-            self.frame_sequences[session_id].append(landmarks)
-            
-            # Keep only last 30 frames (sequence_length)
-            if len(self.frame_sequences[session_id]) > self.sequence_length:
-                self.frame_sequences[session_id] = self.frame_sequences[session_id][-self.sequence_length:]
+            # Slide the window; normalization happens inside the inference graph
+            window = self.frame_sequences[session_id]
+            window[:-1] = window[1:]
+            window[-1] = landmarks
+            self.frame_counts[session_id] = min(self.frame_counts[session_id] + 1, self.sequence_length)
             
             # If we have enough frames, make prediction
-            if len(self.frame_sequences[session_id]) >= self.sequence_length:
-                sequence = np.array(self.frame_sequences[session_id][-self.sequence_length:])
-                
-                # Reshape for model input
-                sequence = sequence.reshape(1, self.sequence_length, -1)
+            if self.frame_counts[session_id] >= self.sequence_length:
+                # Skip the model when the pose has not moved since a confident prediction
+                previous = self.last_landmarks.get(session_id)
+                cached = self.last_prediction.get(session_id)
+                if (previous is not None and cached is not None
+                        and cached["confidence"] > self.duplicate_min_confidence
+                        and np.linalg.norm((window[-1] - previous) * self.feature_inv_stds) < self.duplicate_epsilon):
+                    return dict(cached)  # Callers may annotate the result; keep the stored one intact
                 
-                # Make prediction using your existing method
-                prediction = self.predictor.predict(sequence)
+                # Wait for the (batched) model call that includes this sequence; pass a
+                # snapshot so the next frame cannot slide the window under the worker
+                probs = self._predict(session_id, window.copy())
+                predicted_index = int(np.argmax(probs))
+                predicted_sign = self.index_to_class[predicted_index]
                 
-                return {
-                    "prediction": prediction["predicted_sign"],
-                    "confidence": float(prediction["confidence"]),
+                result = {
+                    "prediction": predicted_sign,
+                    "confidence": float(probs[predicted_index]),
                     "error": False,
                     "session_id": session_id,
-                    "frame_count": len(self.frame_sequences[session_id])
+                    "frame_count": self.frame_counts[session_id]
                 }
+                self.last_landmarks[session_id] = window[-1].copy()
+                self.last_prediction[session_id] = dict(result)
+                return result
             else:
                 # Not enough frames yet
                 return {
@@ -103,7 +315,7 @@ class LiveStreamProcessor:
                     "confidence": 0.0,
                     "error": False,
                     "session_id": session_id,
-                    "frame_count": len(self.frame_sequences[session_id])
+                    "frame_count": self.frame_counts[session_id]
                 }
                 
         except Exception as e:
@@ -115,18 +327,106 @@ class LiveStreamProcessor:
 
     def cleanup_session(self, session_id):
         """Clean up session data"""
-        if session_id in self.frame_sequences:
-            del self.frame_sequences[session_id]
+        with self._session_lock(session_id):
+            if session_id in self.frame_sequences:
+                del self.frame_sequences[session_id]
+                del self.frame_counts[session_id]
+            self.last_landmarks.pop(session_id, None)
+            self.last_prediction.pop(session_id, None)
+            extractor = self.pose_extractors.pop(session_id, None)
+            if extractor is not None:
+                extractor.close()
+        with self._session_locks_guard:
+            self._session_locks.pop(session_id, None)
+
+def _recv_exact(conn, size):
+    """Read exactly size bytes from a socket, or None if the peer closed it"""
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = conn.recv(size - len(buf))
+        if not chunk:
+            return None
+        buf.extend(chunk)
+    return bytes(buf)
+
+def _serve_connection(conn, processor, encode, decode):
+    """Answer one client's length-prefixed requests until it disconnects"""
+    with conn:
+        try:
+            while True:
+                # Each message: 4-byte big-endian length followed by the payload
+                header = _recv_exact(conn, 4)
+                if header is None:
+                    break
+                payload = _recv_exact(conn, struct.unpack('>I', header)[0])
+                if payload is None:
+                    break
+                
+                try:
+                    request = decode(payload)
+                    result = processor.process_single_frame(request['image_path'], request['session_id'])
+                except Exception as e:
+                    result = {"error": True, "message": f"Invalid request: {str(e)}"}
+                
+                response = encode(result)
+                conn.sendall(struct.pack('>I', len(response)) + response)
+        except OSError:
+            pass  # Client reset the connection; the server keeps running
+
+def serve_unix_socket(processor, socket_path, payload_format='msgpack'):
+    """Serve length-prefixed {image_path, session_id} requests over a Unix domain socket
+    
+    Every client connection gets its own handler thread, so sessions on different
+    connections run concurrently and their ready windows share batched model calls.
+    The socket stays up until the server process is stopped.
+    """
+    if payload_format == 'msgpack':
+        encode = lambda obj: msgpack.packb(obj, use_bin_type=True)
+        decode = lambda data: msgpack.unpackb(data, raw=False)
+    else:
+        encode = lambda obj: json.dumps(obj).encode('utf-8')
+        decode = json.loads
+    
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        server.bind(socket_path)
+        server.listen()
+        while True:
+            conn, _ = server.accept()
+            threading.Thread(target=_serve_connection, args=(conn, processor, encode, decode),
+                             daemon=True).start()
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
 
 def main():
     parser = argparse.ArgumentParser(description='Live Stream Frame Processor')
-    parser.add_argument('--image_path', required=True, help='Path to the image file')
-    parser.add_argument('--session_id', required=True, help='Session ID')
+    parser.add_argument('--image_path', help='Path to the image file')
+    parser.add_argument('--session_id', help='Session ID')
+    parser.add_argument('--socket', help='Serve requests over this Unix domain socket path')
+    parser.add_argument('--format', choices=['msgpack', 'json'], default='msgpack',
+                        help='Socket payload encoding (json for debugging)')
     
     args = parser.parse_args()
     
-    try:
+    if args.socket:
+        if args.format == 'msgpack' and not MSGPACK_AVAILABLE:
+            parser.error("msgpack is not installed; use --format json")
+        # SIGTERM unwinds through serve_unix_socket's cleanup so the socket file is removed
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
         processor = LiveStreamProcessor()
+        serve_unix_socket(processor, args.socket, args.format)
+        return
+    
+    if not args.image_path or not args.session_id:
+        parser.error("--image_path and --session_id are required without --socket")
+    
+    try:
+        processor = LiveStreamProcessor(batching=False)
         result = processor.process_single_frame(args.image_path, args.session_id)
         print(json.dumps(result))
         
@@ -16,11 +16,10 @@ from tensorflow import keras
 from tensorflow.keras import layers
 import logging
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
 import matplotlib.pyplot as plt
 from typing import Dict, List, Tuple, Optional
-import pickle
 import pathlib
 
 # Directory containing per-class .npy sequence files
@@ -37,7 +36,6 @@ class EnhancedModelTrainer:
     def __init__(self, config_path: Optional[str] = None):
         self.config = self._load_config(config_path)
         self.model = None
-        self.scaler = StandardScaler()
         self.history = None
 
         # Model parameters
@@ -69,12 +67,15 @@ class EnhancedModelTrainer:
             'feature_dim': 288,
             'lstm_units': 128,
             'attention_units': 64,
+            'attention_heads': 4,
+            'projection_dim': 96,
             'dropout_rate': 0.3,
             'batch_size': 32,
             'epochs': 100,
             'learning_rate': 0.001,
             'patience': 15,
             'enable_attention': True,
+            'enable_xla': True,
             'validation_split': 0.2
         }
         if config_path and os.path.exists(config_path):
@@ -87,20 +88,40 @@ class EnhancedModelTrainer:
                 logger.warning(f"Failed to load config: {e}")
         return default
 
+    def _fused_lstm(self, name: str) -> layers.LSTM:
+        """LSTM layer pinned to the arguments that select the fused cuDNN/CPU kernel."""
+        return layers.LSTM(
+            self.lstm_units,
+            return_sequences=True,
+            activation='tanh',
+            recurrent_activation='sigmoid',
+            recurrent_dropout=0.0,
+            unroll=False,
+            use_bias=True,
+            implementation=2,
+            dtype='float32',
+            name=name
+        )
+
     def create_attention_lstm_model(self) -> keras.Model:
         """Build and compile the attention-based LSTM model."""
         inputs = layers.Input((self.sequence_length, self.feature_dim), name='pose_sequence')
         x = layers.BatchNormalization(name='norm')(inputs)
-        x = layers.LSTM(self.lstm_units, return_sequences=True, name='lstm1')(x)
-        x = layers.LSTM(self.lstm_units, return_sequences=True, name='lstm2')(x)
+        
+        # Learned linear projection shrinks the lstm1 input matmul
+        if self.config.get('projection_dim'):
+            x = layers.Dense(self.config['projection_dim'], activation=None, name='proj')(x)
+        
+        x = self._fused_lstm('lstm1')(x)
+        x = self._fused_lstm('lstm2')(x)
 
         if self.config.get('enable_attention', True):
-            q = layers.Dense(self.attention_units, name='q')(x)
-            k = layers.Dense(self.attention_units, name='k')(x)
-            v = layers.Dense(self.attention_units, name='v')(x)
-            score = layers.Dot(axes=[2,2], name='score')([q,k])
-            weights = layers.Activation('softmax', name='attn_weights')(score)
-            x = layers.Dot(axes=[2,1], name='attn_out')([weights,v])
+            num_heads = self.config.get('attention_heads', 4)
+            x = layers.MultiHeadAttention(
+                num_heads=num_heads,
+                key_dim=self.attention_units // num_heads,
+                name='attn'
+            )(x, x)
             x = layers.GlobalAveragePooling1D(name='attn_pool')(x)
         else:
             x = layers.GlobalAveragePooling1D(name='gap')(x)
@@ -115,17 +136,30 @@ class EnhancedModelTrainer:
         model = keras.Model(inputs, outputs, name='enhanced_lstm_attn')
 
         optimizer = keras.optimizers.Adam(self.learning_rate)
-        model.compile(optimizer, loss='categorical_crossentropy',
-                      metrics=['accuracy', 'top_k_categorical_accuracy'])
+        model.compile(optimizer, loss='sparse_categorical_crossentropy',
+                      metrics=['accuracy', 'sparse_top_k_categorical_accuracy'])
         logger.info("Model built:")
         model.summary(print_fn=logger.info)
         return model
 
+    def _read_npy_shape(self, path: Path) -> Tuple[int, ...]:
+        """Read an .npy array shape from its header without loading the data."""
+        with open(path, 'rb') as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, _, _ = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, _, _ = np.lib.format.read_array_header_2_0(f)
+        return shape
+
     def load_data(self, training_dir: str) -> Tuple[np.ndarray, np.ndarray]:
         """Load .npy sequences and labels."""
-        seqs, labels = [], []
         logger.info(f"Loading data from {training_dir} for classes: {self.vocabulary}")
         base = Path(training_dir)
+        expected_shape = (self.sequence_length, self.feature_dim)
+        
+        # First pass: validate headers so the output can be preallocated
+        files = []
         for cls in self.vocabulary:
             cls_dir = base/cls
             if not cls_dir.exists():
@@ -133,26 +167,46 @@ class EnhancedModelTrainer:
                 continue
             for npy in cls_dir.glob("*.npy"):
                 try:
-                    arr = np.load(npy)
-                    if arr.shape == (self.sequence_length, self.feature_dim):
-                        seqs.append(arr)
-                        labels.append(self.class_to_index[cls])
+                    shape = self._read_npy_shape(npy)
+                    if shape == expected_shape:
+                        files.append((self.class_to_index[cls], npy))
                     else:
-                        logger.warning(f"Skipping {npy}: wrong shape {arr.shape}")
+                        logger.warning(f"Skipping {npy}: wrong shape {shape}")
                 except Exception as e:
                     logger.warning(f"Error loading {npy}: {e}")
         
-        if not seqs:
+        if not files:
+            raise ValueError("No valid data found.")
+        
+        X = np.empty((len(files),) + expected_shape, dtype=np.float32)
+        y = np.fromiter((label for label, _ in files), dtype=np.int64, count=len(files))
+        
+        def load_into(i: int, path: Path) -> bool:
+            try:
+                np.copyto(X[i], np.load(path, mmap_mode='r'))
+                return True
+            except Exception as e:
+                logger.warning(f"Error loading {path}: {e}")
+                return False
+        
+        # Second pass: np.load releases the GIL, so reads overlap across threads
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            loaded = np.fromiter(
+                executor.map(load_into, range(len(files)), (path for _, path in files)),
+                dtype=bool, count=len(files)
+            )
+        
+        if not loaded.all():
+            X, y = X[loaded], y[loaded]
+        if len(X) == 0:
             raise ValueError("No valid data found.")
         
-        X = np.stack(seqs)
-        y = np.array(labels)
         logger.info(f"Loaded {len(X)} sequences.")
         return X, y
 
     def preprocess_data(self, X: np.ndarray, y: np.ndarray
                        ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
-        """Normalize and split data."""
+        """Normalize (in place) and split data."""
         # Check class distribution
         unique_classes, counts = np.unique(y, return_counts=True)
         min_samples = np.min(counts)
@@ -163,13 +217,16 @@ class EnhancedModelTrainer:
         if len(classes_with_one_sample) > 0:
             logger.warning(f"Found {len(classes_with_one_sample)} classes with only 1 sample: {[self.index_to_class[i] for i in classes_with_one_sample]}")
         
-        # Reshape for normalization
-        original_shape = X.shape
-        flat = X.reshape(-1, self.feature_dim)
+        # Per-feature statistics in float32; constant features keep a unit scale
+        X = np.asarray(X, dtype=np.float32)
+        mean = X.mean(axis=(0, 1), keepdims=True).astype(np.float32)
+        std = X.std(axis=(0, 1), keepdims=True).astype(np.float32)
+        std[std == 0] = 1.0
         
-        # Fit and transform
-        norm_flat = self.scaler.fit_transform(flat)
-        X_norm = norm_flat.reshape(original_shape)
+        # Normalize in place to avoid float64 intermediates
+        np.subtract(X, mean, out=X)
+        np.divide(X, std, out=X)
+        X_norm = X
         
         # Save normalization parameters
         data_path = Path(__file__).parent.parent / 'data'
@@ -178,19 +235,17 @@ class EnhancedModelTrainer:
         means_path = data_path / 'feature_means.npy'
         stds_path = data_path / 'feature_stds.npy'
         
-        np.save(means_path, self.scaler.mean_)
-        np.save(stds_path, self.scaler.scale_)
+        np.save(means_path, mean.reshape(-1))
+        np.save(stds_path, std.reshape(-1))
         logger.info(f"Saved normalization parameters to {data_path}")
         
-        # Convert to categorical
-        y_cat = keras.utils.to_categorical(y, self.num_classes)
-        
+        # Integer labels are used directly with sparse categorical crossentropy
         # Handle stratified split - if classes have too few samples, use regular split
         try:
             if min_samples >= 2:
                 # Use stratified split when possible
                 X_train, X_val, y_train, y_val = train_test_split(
-                    X_norm, y_cat,
+                    X_norm, y,
                     test_size=self.config['validation_split'],
                     random_state=42,
                     stratify=y
@@ -199,7 +254,7 @@ class EnhancedModelTrainer:
             else:
                 # Use regular split for classes with insufficient samples
                 X_train, X_val, y_train, y_val = train_test_split(
-                    X_norm, y_cat,
+                    X_norm, y,
                     test_size=self.config['validation_split'],
                     random_state=42
                 )
@@ -209,7 +264,7 @@ class EnhancedModelTrainer:
             # Fallback to regular split if stratified fails
             logger.warning(f"Stratified split failed: {e}. Using regular split.")
             X_train, X_val, y_train, y_val = train_test_split(
-                X_norm, y_cat,
+                X_norm, y,
                 test_size=self.config['validation_split'],
                 random_state=42
             )
@@ -243,12 +298,22 @@ class EnhancedModelTrainer:
             )
         ]
         
+        # Input pipeline: batches are staged on the CPU while the previous step trains
+        train_ds = (tf.data.Dataset.from_tensor_slices((X_train, y_train))
+                    .cache()
+                    .shuffle(len(X_train))
+                    .batch(self.batch_size)
+                    .prefetch(tf.data.AUTOTUNE))
+        val_ds = (tf.data.Dataset.from_tensor_slices((X_val, y_val))
+                  .cache()
+                  .batch(self.batch_size)
+                  .prefetch(tf.data.AUTOTUNE))
+        
         # Train the model
         self.history = model.fit(
-            X_train, y_train,
-            validation_data=(X_val, y_val),
+            train_ds,
+            validation_data=val_ds,
             epochs=self.epochs,
-            batch_size=self.batch_size,
             callbacks=callbacks,
             verbose=1
         )
@@ -271,6 +336,10 @@ class EnhancedModelTrainer:
         
         return model
 
+    def export_tflite_models(self, model: keras.Model, out_path: str, X_sample: np.ndarray) -> Dict[str, str]:
+        """Export float16 (GPU delegate) and int8 (CPU / Edge TPU) TFLite variants."""
+        return export_tflite_models(model, out_path, X_sample)
+
     def evaluate_model(self, X, y) -> Dict:
         """Evaluate the model performance."""
         if self.model is None:
@@ -300,6 +369,54 @@ class EnhancedModelTrainer:
             logger.info(f"Training history saved to {history_path}")
 
 
+def export_tflite_models(model: keras.Model, out_path: str, X_sample: np.ndarray) -> Dict[str, str]:
+    """Write <out_path stem>_fp16.tflite and <out_path stem>_int8.tflite next to the Keras model.
+
+    Shared by model_trainer.py and hyperparameter_tuning.py so the files live_stream_processor.py
+    looks for always follow the model they were converted from.
+    """
+    stem = Path(out_path).with_suffix('')
+    exported = {}
+    
+    def representative_dataset():
+        for i in range(min(len(X_sample), 200)):
+            yield [np.asarray(X_sample[i:i+1], dtype=np.float32)]
+    
+    def convert(int8_ops: Optional[List] = None) -> bytes:
+        converter = tf.lite.TFLiteConverter.from_keras_model(model)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        if int8_ops is None:
+            converter.target_spec.supported_types = [tf.float16]
+        else:
+            converter.representative_dataset = representative_dataset
+            converter.target_spec.supported_ops = int8_ops
+            converter.inference_input_type = tf.int8
+            converter.inference_output_type = tf.int8
+        return converter.convert()
+    
+    for variant in ('fp16', 'int8'):
+        tflite_path = f"{stem}_{variant}.tflite"
+        try:
+            if variant == 'fp16':
+                flatbuffer = convert()
+            else:
+                try:
+                    flatbuffer = convert([tf.lite.OpsSet.TFLITE_BUILTINS_INT8])
+                except Exception as e:
+                    # LSTM/attention ops without an int8 kernel stay float; I/O is still int8
+                    logger.warning(f"Full-integer TFLite conversion failed ({e}); retrying with float fallback ops")
+                    flatbuffer = convert([tf.lite.OpsSet.TFLITE_BUILTINS_INT8,
+                                          tf.lite.OpsSet.TFLITE_BUILTINS])
+            with open(tflite_path, 'wb') as f:
+                f.write(flatbuffer)
+            exported[variant] = tflite_path
+            logger.info(f"TFLite {variant} model saved to {tflite_path}")
+        except Exception:
+            logger.exception(f"TFLite {variant} export FAILED - live inference will not find {tflite_path}")
+    
+    return exported
+
+
 def main():
     if len(sys.argv) != 3:
         print("Usage: python model_trainer.py <training_data_dir> <output_model.h5>")
@@ -309,6 +426,10 @@ def main():
         # Initialize trainer
         trainer = EnhancedModelTrainer()
         
+        # Let XLA fuse the dense/LSTM/attention chain where it can
+        if trainer.config.get('enable_xla', True):
+            tf.config.optimizer.set_jit("autoclustering")
+        
         # Load and preprocess data
         X, y = trainer.load_data(sys.argv[1])
         X_train, X_val, y_train, y_val = trainer.preprocess_data(X, y)
@@ -327,6 +448,9 @@ def main():
         # Save training history
         trainer.save_training_history(sys.argv[2])
         
+        # Export quantized variants for live inference
+        trainer.export_tflite_models(trainer.model, sys.argv[2], X_train)
+        
         logger.info("Training completed successfully!")
         
     except Exception as e:
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Fused per-frame kernels for the pose extraction pipeline
+- normalize_clip: (x - mean) / std clipped to [-5, 5] in one pass
+- standardize: (x - mean) / std without clipping (training-data preparation)
+- quality_score_kernel: component, zero-percentage and variance score in one pass
+- make_normalizer: normalize_clip specialized on fixed means/stds
+Compiled with numba when available; plain NumPy otherwise
+"""
+
+import numpy as np
+
+# numba is optional; the NumPy versions below give identical results
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+CLIP_VALUE = 5.0
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(cache=True, fastmath=True, parallel=True)
+    def normalize_clip(data, means, stds, out):
+        for i in prange(data.shape[0]):
+            for j in range(data.shape[1]):
+                v = (data[i, j] - means[j]) / stds[j]
+                if v > CLIP_VALUE:
+                    v = CLIP_VALUE
+                elif v < -CLIP_VALUE:
+                    v = -CLIP_VALUE
+                out[i, j] = v
+        return out
+
+    @njit(cache=True, parallel=True)
+    def standardize(data, means, stds, out):
+        # No fastmath: the saved training data must match NumPy's division exactly
+        for i in prange(data.shape[0]):
+            for j in range(data.shape[1]):
+                out[i, j] = (data[i, j] - means[j]) / stds[j]
+        return out
+
+    @njit(cache=True, fastmath=True)
+    def quality_score_kernel(features, lh_q, rh_q, pose_q, face_q):
+        # Single pass: zero count, sum and sum of squares (float64 accumulators)
+        n = features.shape[0]
+        zeros = 0
+        total = 0.0
+        total_sq = 0.0
+        for j in range(n):
+            v = np.float64(features[j])
+            if abs(v) < 1e-6:
+                zeros += 1
+            total += v
+            total_sq += v * v
+        mean = total / n
+        variance = max(0.0, total_sq / n - mean * mean)
+
+        component_score = pose_q * 0.4 + lh_q * 0.3 + rh_q * 0.3 + face_q * 0.0
+        data_quality = max(0.0, 1.0 - zeros / n)
+        motion_variance = min(1.0, variance * 1000.0)
+
+        score = component_score * 0.5 + data_quality * 0.3 + motion_variance * 0.2
+        return max(0.0, min(1.0, score))
+
+else:
+
+    def normalize_clip(data, means, stds, out):
+        np.subtract(data, means, out=out)
+        np.divide(out, stds, out=out)
+        np.clip(out, -CLIP_VALUE, CLIP_VALUE, out=out)
+        return out
+
+    def standardize(data, means, stds, out):
+        np.subtract(data, means, out=out)
+        np.divide(out, stds, out=out)
+        return out
+
+    def quality_score_kernel(features, lh_q, rh_q, pose_q, face_q):
+        n = features.shape[0]
+        values = features.astype(np.float64)
+        mean = values.sum() / n
+        variance = max(0.0, float(np.dot(values, values)) / n - mean * mean)
+
+        component_score = pose_q * 0.4 + lh_q * 0.3 + rh_q * 0.3 + face_q * 0.0
+        data_quality = max(0.0, 1.0 - np.count_nonzero(np.abs(values) < 1e-6) / n)
+        motion_variance = min(1.0, variance * 1000.0)
+
+        score = component_score * 0.5 + data_quality * 0.3 + motion_variance * 0.2
+        return max(0.0, min(1.0, score))
+
+
+def make_normalizer(means, stds):
+    """Build normalize(data, out) with the normalization parameters baked in
+
+    (x - mean) / std is rewritten as x * scale + shift with both vectors
+    precomputed once; numba freezes the closure arrays as compile-time constants.
+    """
+    scale = (1.0 / np.asarray(stds, dtype=np.float64)).astype(np.float32)
+    shift = (-np.asarray(means, dtype=np.float64) * scale).astype(np.float32)
+    n_features = scale.shape[0]
+
+    if NUMBA_AVAILABLE:
+
+        @njit(fastmath=True)
+        def normalize(data, out):
+            for i in range(data.shape[0]):
+                for j in range(n_features):
+                    v = data[i, j] * scale[j] + shift[j]
+                    if v > CLIP_VALUE:
+                        v = CLIP_VALUE
+                    elif v < -CLIP_VALUE:
+                        v = -CLIP_VALUE
+                    out[i, j] = v
+            return out
+
+        return normalize
+
+    def normalize(data, out):
+        np.multiply(data, scale, out=out)
+        np.add(out, shift, out=out)
+        np.clip(out, -CLIP_VALUE, CLIP_VALUE, out=out)
+        return out
+
+    return normalize
@@ -16,37 +16,289 @@ import json
 import sys
 import os
 import gc
+import faulthandler
 import argparse
+import types
+import base64
+import hashlib
 import logging
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Tuple, Dict, Optional
 from pathlib import Path
 
+from norm_kernels import make_normalizer, quality_score_kernel
+from landmark_packing import pack_all
+
+# orjson is optional; it serializes the ndarray pose sequence natively without tolist()
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# libjpeg-turbo decoder is optional; cv2.imread is used without it
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    TURBOJPEG_AVAILABLE = True
+except ImportError:
+    TURBOJPEG_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class EnhancedPoseExtractor:
-    """Enhanced pose extractor with unified normalization and quality control"""
+# Per-call statistics logging (reductions over the feature arrays) only when POSE_DEBUG=1
+DEBUG = os.environ.get("POSE_DEBUG") == "1"
+
+# Directory with the MediaPipe Tasks .task models; when set, every extractor without an
+# explicit tasks_model_dir in its config runs the Tasks graphs (GPU delegate by default)
+TASKS_MODEL_DIR = os.environ.get("POSE_TASKS_MODEL_DIR") or None
+
+# Bumped when the layout or meaning of pose cache entries changes
+_POSE_CACHE_VERSION = 2
+
+# Marker queued instead of MediaPipe results for frames skipped by the motion gate
+_REPEAT_FRAME = object()
+
+# Multi-threaded FFmpeg decoding for OpenCV builds without CAP_PROP_N_THREADS
+os.environ.setdefault('OPENCV_FFMPEG_CAPTURE_OPTIONS', 'threads;auto')
+
+# Loaded normalization (means, stds, pad vector, normalizer) per data directory, shared by all extractors
+_NORM_CACHE = {}
+
+# OpenCV >= 4.10 decodes images straight to RGB; older builds decode BGR and preprocessing swaps channels
+_IMREAD_RGB = getattr(cv2, 'IMREAD_COLOR_RGB', None)
+
+# OpenCV decode flags per JPEG DCT-domain downscale factor
+_IMREAD_REDUCED = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+
+class PoseHandsGraph:
+    """Pose + Hands solutions behind Holistic's process() interface, without the face model
     
-    def __init__(self, config_path: Optional[str] = None):
-        self.mp_holistic = mp.solutions.holistic
-        self.holistic = self.mp_holistic.Holistic(
-            static_image_mode=False,
-            model_complexity=1,  # Balanced accuracy vs speed
+    face_landmarks is always None, so the 30 face features stay zero. Hands labels
+    handedness for mirrored input; camera frames are not mirrored, so labels are swapped.
+    """
+    
+    def __init__(self, static_image_mode: bool, model_complexity: int,
+                 min_detection_confidence: float, min_tracking_confidence: float):
+        self.pose = mp.solutions.pose.Pose(
+            static_image_mode=static_image_mode,
+            model_complexity=model_complexity,
             enable_segmentation=False,
-            min_detection_confidence=0.7,  # Higher threshold for quality
-            min_tracking_confidence=0.7
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+        self.hands = mp.solutions.hands.Hands(
+            static_image_mode=static_image_mode,
+            max_num_hands=2,
+            model_complexity=min(model_complexity, 1),
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+    
+    def process(self, rgb_frame: np.ndarray):
+        pose_results = self.pose.process(rgb_frame)
+        hand_results = self.hands.process(rgb_frame)
+        
+        left_hand = right_hand = None
+        if hand_results.multi_hand_landmarks:
+            for landmarks, handedness in zip(hand_results.multi_hand_landmarks, hand_results.multi_handedness):
+                if handedness.classification[0].label == 'Left':
+                    right_hand = landmarks
+                else:
+                    left_hand = landmarks
+        
+        return types.SimpleNamespace(
+            pose_landmarks=pose_results.pose_landmarks,
+            left_hand_landmarks=left_hand,
+            right_hand_landmarks=right_hand,
+            face_landmarks=None
         )
+    
+    def reset(self):
+        self.pose.reset()
+        self.hands.reset()
+    
+    def close(self):
+        self.pose.close()
+        self.hands.close()
+
+
+class TasksPoseHandsGraph:
+    """Pose + Hand (+ Face) landmarkers from the MediaPipe Tasks API behind Holistic's process() interface
+    
+    The Tasks models run on the GPU delegate when use_gpu is set. Handedness labels are swapped
+    for non-mirrored camera frames. With use_face the Face landmarker fills face_landmarks; its
+    mesh shares Holistic's point order (iris points are appended at the end), so the first 10
+    points keep the meaning of the 30 face features. Without it, as with PoseHandsGraph, there
+    is no face model.
+    Expects pose_landmarker_{lite,full,heavy}.task, hand_landmarker.task and, with use_face,
+    face_landmarker.task in model_dir.
+    """
+    
+    POSE_MODELS = ('pose_landmarker_lite.task', 'pose_landmarker_full.task', 'pose_landmarker_heavy.task')
+    HAND_MODEL = 'hand_landmarker.task'
+    FACE_MODEL = 'face_landmarker.task'
+    
+    # Synthetic frame spacing for VIDEO running mode timestamps
+    FRAME_INTERVAL_MS = 33
+    
+    def __init__(self, model_dir: str, static_image_mode: bool, model_complexity: int,
+                 min_detection_confidence: float, min_tracking_confidence: float, use_gpu: bool = True,
+                 use_face: bool = True):
+        from mediapipe.tasks.python import BaseOptions, vision
+        
+        self._vision = vision
+        self._video_mode = not static_image_mode
+        model_dir = Path(model_dir)
+        delegate = BaseOptions.Delegate.GPU if use_gpu else BaseOptions.Delegate.CPU
+        running_mode = vision.RunningMode.VIDEO if self._video_mode else vision.RunningMode.IMAGE
         
+        self._pose_options = vision.PoseLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=str(model_dir / self.POSE_MODELS[min(model_complexity, 2)]),
+                                     delegate=delegate),
+            running_mode=running_mode,
+            num_poses=1,
+            min_pose_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+        self._hand_options = vision.HandLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=str(model_dir / self.HAND_MODEL), delegate=delegate),
+            running_mode=running_mode,
+            num_hands=2,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence
+        )
+        self._face_options = None
+        if use_face:
+            face_model = model_dir / self.FACE_MODEL
+            if not face_model.exists():
+                # Checked up front: a graph without faces would silently zero 30 features
+                raise FileNotFoundError(f"{face_model} is required while use_face_model is enabled")
+            self._face_options = vision.FaceLandmarkerOptions(
+                base_options=BaseOptions(model_asset_path=str(face_model), delegate=delegate),
+                running_mode=running_mode,
+                num_faces=1,
+                min_face_detection_confidence=min_detection_confidence,
+                min_tracking_confidence=min_tracking_confidence
+            )
+        self._open()
+    
+    def _open(self):
+        self.pose = self._vision.PoseLandmarker.create_from_options(self._pose_options)
+        self.hands = self._vision.HandLandmarker.create_from_options(self._hand_options)
+        self.face = None
+        if self._face_options is not None:
+            self.face = self._vision.FaceLandmarker.create_from_options(self._face_options)
+        self._timestamp_ms = 0
+    
+    def process(self, rgb_frame: np.ndarray):
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(rgb_frame))
+        if self._video_mode:
+            self._timestamp_ms += self.FRAME_INTERVAL_MS
+            pose_result = self.pose.detect_for_video(image, self._timestamp_ms)
+            hand_result = self.hands.detect_for_video(image, self._timestamp_ms)
+            face_result = self.face.detect_for_video(image, self._timestamp_ms) if self.face else None
+        else:
+            pose_result = self.pose.detect(image)
+            hand_result = self.hands.detect(image)
+            face_result = self.face.detect(image) if self.face else None
+        
+        left_hand = right_hand = None
+        for landmarks, handedness in zip(hand_result.hand_landmarks, hand_result.handedness):
+            if handedness[0].category_name == 'Left':
+                right_hand = types.SimpleNamespace(landmark=landmarks)
+            else:
+                left_hand = types.SimpleNamespace(landmark=landmarks)
+        
+        pose = None
+        if pose_result.pose_landmarks:
+            pose = types.SimpleNamespace(landmark=pose_result.pose_landmarks[0])
+        
+        face = None
+        if face_result is not None and face_result.face_landmarks:
+            face = types.SimpleNamespace(landmark=face_result.face_landmarks[0])
+        
+        return types.SimpleNamespace(
+            pose_landmarks=pose,
+            left_hand_landmarks=left_hand,
+            right_hand_landmarks=right_hand,
+            face_landmarks=face
+        )
+    
+    def reset(self):
+        # Landmarkers have no reset; VIDEO mode tracking is dropped by recreating them
+        if self._video_mode:
+            self.close()
+            self._open()
+    
+    def close(self):
+        self.pose.close()
+        self.hands.close()
+        if self.face is not None:
+            self.face.close()
+
+
+class EnhancedPoseExtractor:
+    """Enhanced pose extractor with unified normalization and quality control"""
+    
+    def __init__(self, config_path: Optional[str] = None):
         # Load configuration
         self.config = self._load_config(config_path)
         
+        self.mp_holistic = mp.solutions.holistic
+        self._tasks_available = True
+        self.holistic = self._create_holistic(static_image_mode=False)
+        if isinstance(self.holistic, TasksPoseHandsGraph):
+            delegate = 'GPU' if self.config['use_gpu_delegate'] else 'CPU'
+            logger.info(f"✅ MediaPipe backend: Tasks API ({delegate} delegate)")
+        else:
+            logger.info("✅ MediaPipe backend: solutions API (CPU)")
+        
+        # Lite graph for the live frame-sequence path (created on first use)
+        self.holistic_lite = None
+        
+        # Per-thread Holistic graphs for parallel frame-sequence extraction (created on first use)
+        self._holistic_pool = None
+        self._frame_executor = None
+        
         # Initialize normalization
         self.feature_means = None
         self.feature_stds = None
         self.normalization_loaded = False
+        self._pad_vector = None
+        self._norm_fn = None
         self._load_normalization_params()
         
+        # Content-addressed landmark cache for repeated training-data extraction
+        self.pose_cache_dir = None
+        if self.config['enable_pose_cache']:
+            self.pose_cache_dir = Path(self.config['pose_cache_dir'] or Path(__file__).parent / '..' / 'data' / 'pose_cache')
+            self.pose_cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Preallocated feature buffer with per-component landmark views
+        self._scratch = self._new_scratch()
+        
+        # Shared result for frames with no detections; read-only since callers copy it out
+        self._zero_features = np.zeros(288, dtype=np.float32)
+        self._zero_features.flags.writeable = False
+        
+        self.jpeg = None
+        if TURBOJPEG_AVAILABLE:
+            try:
+                self.jpeg = TurboJPEG()
+            except Exception:
+                self.jpeg = None
+        
+        # Frame buffers reused by video decoding and _preprocess_frame (sized on first frame)
+        self._frame_buf = None
+        self._resize_buf = None
+        self._rgb_buf = None
+        
         # Quality metrics
         self.min_quality_score = 0.4
         self.frame_stats = {
@@ -65,7 +317,19 @@ class EnhancedPoseExtractor:
             'max_zero_percentage': 0.7,
             'min_motion_variance': 0.001,
             'enable_quality_filtering': True,
-            'enable_temporal_smoothing': True
+            'enable_temporal_smoothing': True,
+            'enable_pose_cache': False,
+            'pose_cache_dir': None,
+            'enable_motion_gate': True,
+            'motion_gate_threshold': 2.0,
+            'dhash_max_distance': 2,
+            'frame_workers': 1,
+            'model_complexity': 1,
+            'model_complexity_live': 0,
+            'pose_sequence_dtype': 'float32',
+            'use_face_model': True,
+            'tasks_model_dir': TASKS_MODEL_DIR,
+            'use_gpu_delegate': os.environ.get("POSE_USE_GPU", "1") != "0"
         }
         
         if config_path and os.path.exists(config_path):
@@ -83,22 +347,42 @@ class EnhancedPoseExtractor:
         """Load normalization parameters with enhanced error handling"""
         try:
             script_dir = Path(__file__).parent
-            data_dir = script_dir / '..' / 'data'
+            data_dir = (script_dir / '..' / 'data').resolve()
+            
+            # Later extractors in the same process reuse the arrays and the compiled normalizer
+            cached = _NORM_CACHE.get(data_dir)
+            if cached is not None:
+                self.feature_means, self.feature_stds, self._pad_vector, self._norm_fn = cached
+                self.normalization_loaded = True
+                return
             
             means_path = data_dir / 'feature_means.npy'
             stds_path = data_dir / 'feature_stds.npy'
             
             if means_path.exists() and stds_path.exists():
-                self.feature_means = np.load(means_path)
-                self.feature_stds = np.load(stds_path)
+                # Memory-mapped so repeated per-request processes share the page cache
+                means = np.load(means_path, mmap_mode='r')
+                stds = np.load(stds_path, mmap_mode='r')
+                
+                # Flat float32 so the fused normalization kernel sees one dtype;
+                # means already stored as float32 stay on the read-only mapping
+                if means.dtype == np.float32:
+                    self.feature_means = means.reshape(-1)
+                else:
+                    self.feature_means = means.astype(np.float32).reshape(-1)
                 
-                # Ensure no zero standard deviations
-                self.feature_stds = np.where(self.feature_stds == 0, 1e-8, self.feature_stds)
+                # Ensure no zero standard deviations (in-memory copy, the mapping stays read-only)
+                self.feature_stds = np.where(stds == 0, 1e-8, stds).astype(np.float32).reshape(-1)
+                self.feature_stds.setflags(write=False)
                 
                 self.normalization_loaded = True
+                self._pad_vector = self._compute_pad_vector()
+                self._norm_fn = make_normalizer(self.feature_means, self.feature_stds)
+                _NORM_CACHE[data_dir] = (self.feature_means, self.feature_stds, self._pad_vector, self._norm_fn)
                 logger.info("✅ Normalization parameters loaded successfully")
-                logger.info(f"   Means shape: {self.feature_means.shape}, range: [{self.feature_means.min():.4f}, {self.feature_means.max():.4f}]")
-                logger.info(f"   Stds shape: {self.feature_stds.shape}, range: [{self.feature_stds.min():.4f}, {self.feature_stds.max():.4f}]")
+                if DEBUG:
+                    logger.info(f"   Means shape: {self.feature_means.shape}, range: [{self.feature_means.min():.4f}, {self.feature_means.max():.4f}]")
+                    logger.info(f"   Stds shape: {self.feature_stds.shape}, range: [{self.feature_stds.min():.4f}, {self.feature_stds.max():.4f}]")
             else:
                 logger.error("❌ CRITICAL: Normalization files not found!")
                 logger.error(f"   Expected paths: {means_path}, {stds_path}")
@@ -114,45 +398,66 @@ class EnhancedPoseExtractor:
         self.feature_means = np.zeros(self.config['feature_dim'], dtype=np.float32)
         self.feature_stds = np.ones(self.config['feature_dim'], dtype=np.float32)
         self.normalization_loaded = True
+        self._pad_vector = self._compute_pad_vector()
+        self._norm_fn = make_normalizer(self.feature_means, self.feature_stds)
         logger.warning("⚠️ Using default normalization - model accuracy may be reduced!")
     
-    def extract_keypoints_enhanced(self, results) -> Tuple[np.ndarray, float]:
+    def _compute_pad_vector(self) -> np.ndarray:
+        """Normalized all-zero frame used to pad short sequences"""
+        return np.clip((-self.feature_means) / self.feature_stds, -5.0, 5.0).astype(np.float32)
+    
+    def _create_holistic(self, static_image_mode: bool, model_complexity: Optional[int] = None):
+        """Create a Holistic graph with the extractor's detection settings"""
+        if model_complexity is None:
+            model_complexity = self.config.get('model_complexity', 1)  # Balanced accuracy vs speed
+        if self.config.get('tasks_model_dir') and self._tasks_available:
+            try:
+                return TasksPoseHandsGraph(
+                    self.config['tasks_model_dir'], static_image_mode, model_complexity,
+                    self.config.get('min_detection_confidence', 0.7),
+                    self.config.get('min_tracking_confidence', 0.7),
+                    use_gpu=self.config.get('use_gpu_delegate', True),
+                    use_face=self.config.get('use_face_model', True)
+                )
+            except Exception as e:
+                # Missing models, old mediapipe or no usable GPU: stay on the solutions API from now on
+                logger.warning(f"⚠️ MediaPipe Tasks graph unavailable, falling back to solutions API: {e}")
+                self._tasks_available = False
+        if not self.config.get('use_face_model', True):
+            return PoseHandsGraph(
+                static_image_mode, model_complexity,
+                self.config.get('min_detection_confidence', 0.7),
+                self.config.get('min_tracking_confidence', 0.7)
+            )
+        return self.mp_holistic.Holistic(
+            static_image_mode=static_image_mode,
+            model_complexity=model_complexity,
+            enable_segmentation=False,
+            refine_face_landmarks=False,  # Only 10 face points are used; skip the attention mesh
+            min_detection_confidence=self.config.get('min_detection_confidence', 0.7),  # Higher threshold for quality
+            min_tracking_confidence=self.config.get('min_tracking_confidence', 0.7)
+        )
+    
+    @staticmethod
+    def _new_scratch() -> Tuple[np.ndarray, Tuple[np.ndarray, ...]]:
+        """Feature buffer plus left hand / right hand / pose / face landmark views into it"""
+        buf = np.zeros(288, dtype=np.float32)
+        return buf, (buf[:63].reshape(21, 3), buf[63:126].reshape(21, 3),
+                     buf[126:258].reshape(33, 4), buf[258:288].reshape(10, 3))
+    
+    def extract_keypoints_enhanced(self, results, scratch=None) -> Tuple[np.ndarray, float]:
         """Extract 288 features with quality scoring"""
         try:
-            # Left hand (21 * 3 = 63 features)
-            if results.left_hand_landmarks:
-                lh = np.array([[lm.x, lm.y, lm.z] for lm in results.left_hand_landmarks.landmark]).flatten()
-                lh_quality = 1.0
-            else:
-                lh = np.zeros(63, dtype=np.float32)
-                lh_quality = 0.0
+            # Nothing detected (common at clip start/end): zero features score 0.0 quality
+            if not (results.left_hand_landmarks or results.right_hand_landmarks
+                    or results.pose_landmarks or results.face_landmarks):
+                return self._zero_features, 0.0
             
-            # Right hand (21 * 3 = 63 features)  
-            if results.right_hand_landmarks:
-                rh = np.array([[lm.x, lm.y, lm.z] for lm in results.right_hand_landmarks.landmark]).flatten()
-                rh_quality = 1.0
-            else:
-                rh = np.zeros(63, dtype=np.float32)
-                rh_quality = 0.0
-            
-            # Pose with visibility (33 * 4 = 132 features)
-            if results.pose_landmarks:
-                pose = np.array([[lm.x, lm.y, lm.z, lm.visibility] for lm in results.pose_landmarks.landmark]).flatten()
-                pose_quality = np.mean([lm.visibility for lm in results.pose_landmarks.landmark])
-            else:
-                pose = np.zeros(132, dtype=np.float32)
-                pose_quality = 0.0
+            buf, views = scratch or self._scratch
+            lh_quality, rh_quality, pose_quality, face_quality = pack_all(results, views)
             
-            # Face landmarks (10 * 3 = 30 features)
-            if results.face_landmarks and len(results.face_landmarks.landmark) >= 10:
-                face = np.array([[lm.x, lm.y, lm.z] for lm in results.face_landmarks.landmark[:10]]).flatten()
-                face_quality = 1.0
-            else:
-                face = np.zeros(30, dtype=np.float32)
-                face_quality = 0.0
-            
-            # Combine features (63 + 63 + 132 + 30 = 288)
-            features = np.concatenate([lh, rh, pose, face]).astype(np.float32)
+            # Copy out of the scratch buffer (63 + 63 + 132 + 30 = 288)
+            features = buf.copy()
             
             # Calculate comprehensive quality score
             quality_score = self._calculate_quality_score(features, lh_quality, rh_quality, pose_quality, face_quality)
@@ -163,25 +468,24 @@ class EnhancedPoseExtractor:
             logger.error(f"❌ Feature extraction failed: {e}")
             return np.zeros(288, dtype=np.float32), 0.0
     
+    def extract_landmarks(self, frame: np.ndarray) -> Optional[np.ndarray]:
+        """Extract raw 288 features from one BGR frame using the long-lived Holistic graph"""
+        results = self.holistic.process(self._preprocess_frame(frame))
+        if not (results.left_hand_landmarks or results.right_hand_landmarks
+                or results.pose_landmarks or results.face_landmarks):
+            return None
+        
+        features, _ = self.extract_keypoints_enhanced(results)
+        return features
+    
     def _calculate_quality_score(self, features: np.ndarray, lh_q: float, rh_q: float, pose_q: float, face_q: float) -> float:
         """Calculate comprehensive quality score for a frame"""
-        if len(features) != 288:
-            return 0.0
-        
-        # Component quality (weighted by importance)
-        component_score = (pose_q * 0.4 + lh_q * 0.3 + rh_q * 0.3 + face_q * 0.0)  # Face less important
-        
-        # Data quality metrics
-        zero_percentage = np.sum(np.abs(features) < 1e-6) / len(features)
-        data_quality = max(0.0, 1.0 - zero_percentage)
+        # Features always come from the fixed 288-wide scratch buffer
+        if DEBUG:
+            assert features.shape == (288,), features.shape
         
-        # Motion variance (indicates meaningful movement)
-        motion_variance = min(1.0, np.var(features) * 1000)
-        
-        # Combined score
-        quality_score = (component_score * 0.5 + data_quality * 0.3 + motion_variance * 0.2)
-        
-        return max(0.0, min(1.0, quality_score))
+        # Component weights, zero percentage and motion variance in one fused pass
+        return float(quality_score_kernel(features, float(lh_q), float(rh_q), float(pose_q), float(face_q)))
     
     def process_video_file(self, video_path: str, max_frames: int = 30) -> Dict:
         """Process video file with enhanced quality control"""
@@ -190,9 +494,10 @@ class EnhancedPoseExtractor:
         if not os.path.exists(video_path):
             return self._create_error_response(f"Video file not found: {video_path}")
         
-        cap = cv2.VideoCapture(video_path)
+        cap = self._open_video(video_path)
         if not cap.isOpened():
             return self._create_error_response(f"Cannot open video: {video_path}")
+        self._reset_tracking()
         
         # Get video properties
         fps = cap.get(cv2.CAP_PROP_FPS)
@@ -201,10 +506,16 @@ class EnhancedPoseExtractor:
         
         logger.info(f"📊 Video info: {total_frames} frames, {fps:.2f} FPS, {duration:.2f}s")
         
-        # Extract frames with quality awareness
-        raw_sequences = []
-        quality_scores = []
+        # Extract frames with quality awareness into preallocated buffers
+        raw_sequences = np.empty((max_frames, 288), dtype=np.float32)
+        quality_scores = np.empty(max_frames, dtype=np.float32)
         frame_count = 0
+        skipped_frames = 0
+        prev_small = None
+        
+        # No cyclic GC pauses between frames; the loop only churns refcounted arrays
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
         
         try:
             # Calculate frame sampling strategy
@@ -214,22 +525,44 @@ class EnhancedPoseExtractor:
                 # Smart sampling: more frames from middle section
                 frame_indices = self._calculate_smart_sampling(total_frames, max_frames)
             
-            for frame_idx in frame_indices:
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-                ret, frame = cap.read()
+            # Single sequential pass: grab() advances without decoding,
+            # retrieve() decodes only the sampled frames
+            wanted_frames = set(frame_indices)
+            last_wanted = max(frame_indices) if frame_indices else -1
+            
+            for frame_idx in range(last_wanted + 1):
+                if not cap.grab():
+                    break
+                if frame_idx not in wanted_frames:
+                    continue
                 
+                ret, frame = cap.retrieve(self._frame_buf)
                 if not ret:
                     continue
+                self._frame_buf = frame
                 
                 # Preprocess frame
                 processed_frame = self._preprocess_frame(frame)
                 
+                # Reuse the previous features for near-static frames instead of running MediaPipe
+                if self.config['enable_motion_gate']:
+                    small = self._motion_signature(processed_frame)
+                    if prev_small is not None and self._is_static(small, prev_small):
+                        raw_sequences[frame_count] = raw_sequences[frame_count - 1]
+                        quality_scores[frame_count] = quality_scores[frame_count - 1]
+                        frame_count += 1
+                        skipped_frames += 1
+                        if frame_count >= max_frames:
+                            break
+                        continue
+                    prev_small = small
+                
                 # Extract pose
                 results = self.holistic.process(processed_frame)
                 features, quality = self.extract_keypoints_enhanced(results)
                 
-                raw_sequences.append(features.tolist())
-                quality_scores.append(quality)
+                raw_sequences[frame_count] = features
+                quality_scores[frame_count] = quality
                 frame_count += 1
                 
                 if frame_count >= max_frames:
@@ -237,75 +570,546 @@ class EnhancedPoseExtractor:
         
         finally:
             cap.release()
-            gc.collect()
+            if gc_was_enabled:
+                gc.enable()
         
-        if not raw_sequences:
+        if frame_count == 0:
             return self._create_error_response("No valid frames extracted")
         
         # Apply quality filtering and normalization
-        return self._finalize_processing(raw_sequences, quality_scores, {
+        return self._finalize_processing(raw_sequences[:frame_count], quality_scores[:frame_count], {
             'source': 'video_file',
             'total_frames': total_frames,
             'processed_frames': frame_count,
+            'motion_skipped_frames': skipped_frames,
             'fps': fps,
             'duration': duration
         })
     
+    def process_video_file_threaded(self, video_path: str, max_frames: int = 30) -> Dict:
+        """Process video file with decode, MediaPipe and feature extraction overlapped on threads"""
+        logger.info(f"🎬 Processing video (threaded): {video_path}")
+        
+        if not os.path.exists(video_path):
+            return self._create_error_response(f"Video file not found: {video_path}")
+        
+        cap = self._open_video(video_path)
+        if not cap.isOpened():
+            return self._create_error_response(f"Cannot open video: {video_path}")
+        self._reset_tracking()
+        
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        duration = total_frames / fps if fps > 0 else 0
+        
+        logger.info(f"📊 Video info: {total_frames} frames, {fps:.2f} FPS, {duration:.2f}s")
+        
+        if total_frames <= max_frames:
+            frame_indices = list(range(total_frames))
+        else:
+            frame_indices = self._calculate_smart_sampling(total_frames, max_frames)
+        
+        wanted_frames = set(frame_indices)
+        last_wanted = max(frame_indices) if frame_indices else -1
+        
+        # Bounded queues give back-pressure between the stages
+        decode_q = queue.Queue(maxsize=4)
+        extract_q = queue.Queue(maxsize=4)
+        stop = threading.Event()
+        
+        raw_sequences = np.empty((max(len(frame_indices), 1), 288), dtype=np.float32)
+        quality_scores = np.empty(len(raw_sequences), dtype=np.float32)
+        frame_count = 0
+        skipped_frames = 0
+        
+        def decode_worker():
+            # The BGR decode target is reused; preprocessing copies each frame out before queueing
+            frame_buf = None
+            try:
+                for frame_idx in range(last_wanted + 1):
+                    if stop.is_set() or not cap.grab():
+                        break
+                    if frame_idx not in wanted_frames:
+                        continue
+                    ret, frame = cap.retrieve(frame_buf)
+                    if ret:
+                        frame_buf = frame
+                        decode_q.put(self._preprocess_frame(frame, reuse_buffers=False))
+            finally:
+                decode_q.put(None)
+        
+        def extract_worker():
+            nonlocal frame_count
+            while True:
+                results = extract_q.get()
+                if results is None:
+                    break
+                if results is _REPEAT_FRAME:
+                    raw_sequences[frame_count] = raw_sequences[frame_count - 1]
+                    quality_scores[frame_count] = quality_scores[frame_count - 1]
+                else:
+                    features, quality = self.extract_keypoints_enhanced(results)
+                    raw_sequences[frame_count] = features
+                    quality_scores[frame_count] = quality
+                frame_count += 1
+        
+        decoder = threading.Thread(target=decode_worker, daemon=True)
+        extractor = threading.Thread(target=extract_worker, daemon=True)
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        decoder.start()
+        extractor.start()
+        
+        try:
+            # MediaPipe inference stays on this thread with the single Holistic instance
+            prev_small = None
+            while True:
+                processed_frame = decode_q.get()
+                if processed_frame is None:
+                    break
+                if self.config['enable_motion_gate']:
+                    small = self._motion_signature(processed_frame)
+                    if prev_small is not None and self._is_static(small, prev_small):
+                        extract_q.put(_REPEAT_FRAME)
+                        skipped_frames += 1
+                        continue
+                    prev_small = small
+                extract_q.put(self.holistic.process(processed_frame))
+        finally:
+            stop.set()
+            while decoder.is_alive():
+                try:
+                    decode_q.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            extract_q.put(None)
+            extractor.join()
+            cap.release()
+            if gc_was_enabled:
+                gc.enable()
+        
+        if frame_count == 0:
+            return self._create_error_response("No valid frames extracted")
+        
+        return self._finalize_processing(raw_sequences[:frame_count], quality_scores[:frame_count], {
+            'source': 'video_file',
+            'total_frames': total_frames,
+            'processed_frames': frame_count,
+            'motion_skipped_frames': skipped_frames,
+            'fps': fps,
+            'duration': duration
+        })
+    
+    def _motion_signature(self, rgb_frame: np.ndarray) -> np.ndarray:
+        """16x16 grayscale thumbnail used to detect static frames cheaply"""
+        small = cv2.resize(rgb_frame, (16, 16), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+    
+    def _is_static(self, small: np.ndarray, prev_small: np.ndarray) -> bool:
+        """True when the thumbnail barely differs from the last frame sent to MediaPipe"""
+        return float(np.mean(cv2.absdiff(small, prev_small))) < self.config['motion_gate_threshold']
+    
+    def _get_live_holistic(self):
+        """Holistic graph for live frame sequences (lite model unless configured otherwise)"""
+        live_complexity = self.config.get('model_complexity_live', 0)
+        if live_complexity == self.config.get('model_complexity', 1):
+            return self.holistic
+        if self.holistic_lite is None:
+            self.holistic_lite = self._create_holistic(static_image_mode=False, model_complexity=live_complexity)
+        return self.holistic_lite
+    
+    def _reset_tracking(self, holistic=None):
+        """Drop Holistic tracking state so a new clip does not inherit the previous one's landmarks"""
+        holistic = holistic or self.holistic
+        if hasattr(holistic, 'reset'):
+            holistic.reset()
+    
+    def close(self):
+        """Release the MediaPipe graphs and the frame pool; safe to call more than once
+        
+        Graph memory is native and not reclaimed by gc.collect(), so long-lived processes
+        should close extractors they discard (or use the extractor as a context manager).
+        """
+        if self._frame_executor is not None:
+            self._frame_executor.shutdown(wait=True)
+            self._frame_executor = None
+        if self._holistic_pool is not None:
+            while not self._holistic_pool.empty():
+                holistic, _ = self._holistic_pool.get_nowait()
+                holistic.close()
+            self._holistic_pool = None
+        for holistic in (self.holistic_lite, self.holistic):
+            if holistic is not None:
+                holistic.close()
+        self.holistic_lite = None
+        self.holistic = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
+    def _open_video(self, video_path: str) -> cv2.VideoCapture:
+        """Open a video with the FFmpeg backend, hardware decoding when available and multi-threaded decoding"""
+        # Hardware acceleration has to be requested at open time (OpenCV >= 4.5.2)
+        if hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+            cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG,
+                                   [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        else:
+            cap = cv2.VideoCapture(video_path, cv2.CAP_FFMPEG)
+        if hasattr(cv2, 'CAP_PROP_N_THREADS'):
+            cap.set(cv2.CAP_PROP_N_THREADS, os.cpu_count() or 4)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        return cap
+    
     def process_frame_sequence(self, frame_paths: List[str], max_frames: int = 30) -> Dict:
         """Process sequence of frame images (for live streaming)"""
         logger.info(f"🖼️ Processing {len(frame_paths)} frame images")
         
-        raw_sequences = []
-        quality_scores = []
-        valid_frames = 0
-        
         # Limit and select best frames
         selected_paths = self._select_best_frames(frame_paths, max_frames)
         
-        for i, frame_path in enumerate(selected_paths):
+        raw_sequences = np.empty((max(len(selected_paths), 1), 288), dtype=np.float32)
+        quality_scores = np.empty(len(raw_sequences), dtype=np.float32)
+        valid_frames = 0
+        
+        # Frames are independent images, so they can be spread over the Holistic pool
+        # (static-image graphs, so the tracking live graph is not needed there)
+        gated = self.config['enable_motion_gate'] and self.pose_cache_dir is None
+        if self.config['frame_workers'] > 1 and len(selected_paths) > 1:
+            if gated:
+                extracted_frames = self._extract_frames_pooled_gated(selected_paths)
+            else:
+                extracted_frames = self._get_frame_executor().map(self._extract_pooled, selected_paths)
+        else:
+            live_holistic = self._get_live_holistic()
+            self._reset_tracking(live_holistic)
+            if gated:
+                extracted_frames = self._extract_frames_gated(selected_paths, live_holistic)
+            else:
+                extracted_frames = (self._extract_frame_safe(path, live_holistic) for path in selected_paths)
+        
+        for extracted in extracted_frames:
+            if extracted is None:
+                continue
+            features, quality = extracted
+            
+            raw_sequences[valid_frames] = features
+            quality_scores[valid_frames] = quality
+            valid_frames += 1
+        
+        if valid_frames == 0:
+            return self._create_error_response("No valid frames processed from sequence")
+        
+        return self._finalize_processing(raw_sequences[:valid_frames], quality_scores[:valid_frames], {
+            'source': 'frame_sequence',
+            'input_frames': len(frame_paths),
+            'processed_frames': valid_frames,
+            'selection_method': 'quality_based'
+        })
+    
+    def process_frame_array(self, frame: np.ndarray, is_rgb: bool = False) -> Dict:
+        """Process one in-memory frame from a live stream (BGR unless is_rgb)
+        
+        The frame goes straight to the live Holistic graph without a JPEG round-trip.
+        Tracking state carries over between calls, since successive frames come from one
+        stream. Returns the process_frame_sequence response shape with a single
+        normalized (1, 288) row and its quality score.
+        """
+        try:
+            rgb_frame = self._preprocess_frame(frame, is_rgb=is_rgb)
+            features, quality = self.extract_keypoints_enhanced(self._get_live_holistic().process(rgb_frame))
+            # Normalization writes a new array, so the scratch feature buffer is not handed out
+            normalized, is_normalized = self._apply_normalization(features[np.newaxis])
+        except Exception as e:
+            return self._create_error_response(f"Frame processing failed: {e}")
+        
+        return {
+            'success': True,
+            'pose_sequence': normalized,
+            'sequence_length': 1,
+            'feature_dimension': normalized.shape[1],
+            'normalized': is_normalized,
+            'quality_score': float(quality)
+        }
+    
+    def _extract_frames_gated(self, frame_paths: List[str], holistic):
+        """Serial frame extraction that repeats the previous result for near-duplicate frames
+        
+        Each frame's 64-bit difference hash is compared with the last frame sent to MediaPipe;
+        within dhash_max_distance differing bits the previous features and quality are reused.
+        """
+        max_distance = self.config['dhash_max_distance']
+        prev_hash = None
+        prev_extracted = None
+        
+        for frame_path in frame_paths:
             try:
                 if not os.path.exists(frame_path):
                     logger.warning(f"⚠️ Frame not found: {frame_path}")
+                    yield None
                     continue
                 
-                # Load and process frame
-                frame = cv2.imread(frame_path)
+                frame, is_rgb = self._read_frame(frame_path)
                 if frame is None:
+                    yield None
                     continue
+                rgb_frame = self._preprocess_frame(frame, is_rgb=is_rgb)
                 
-                processed_frame = self._preprocess_frame(frame)
-                results = self.holistic.process(processed_frame)
-                features, quality = self.extract_keypoints_enhanced(results)
+                frame_hash = self._dhash(rgb_frame)
+                if prev_extracted is not None and bin(frame_hash ^ prev_hash).count('1') <= max_distance:
+                    yield prev_extracted
+                    continue
+                
+                prev_hash = frame_hash
+                prev_extracted = self.extract_keypoints_enhanced(holistic.process(rgb_frame))
+                yield prev_extracted
+                
+            except Exception as e:
+                logger.warning(f"⚠️ Error processing frame {frame_path}: {e}")
+                yield None
+    
+    def _extract_frames_pooled_gated(self, frame_paths: List[str]):
+        """Pooled counterpart of _extract_frames_gated
+        
+        Frames are decoded and hashed here, in order, and only those that differ from the
+        last submitted frame go to the Holistic pool; near-duplicates reuse its future.
+        """
+        executor = self._get_frame_executor()
+        max_distance = self.config['dhash_max_distance']
+        prev_hash = None
+        prev_future = None
+        futures = []
+        
+        for frame_path in frame_paths:
+            try:
+                if not os.path.exists(frame_path):
+                    logger.warning(f"⚠️ Frame not found: {frame_path}")
+                    futures.append(None)
+                    continue
+                
+                frame, is_rgb = self._read_frame(frame_path)
+                if frame is None:
+                    futures.append(None)
+                    continue
+                # Queued for another thread, so the shared preprocessing buffers are off limits
+                rgb_frame = self._preprocess_frame(frame, reuse_buffers=False, is_rgb=is_rgb)
                 
-                raw_sequences.append(features.tolist())
-                quality_scores.append(quality)
-                valid_frames += 1
+                frame_hash = self._dhash(rgb_frame)
+                if prev_future is None or bin(frame_hash ^ prev_hash).count('1') > max_distance:
+                    prev_hash = frame_hash
+                    prev_future = executor.submit(self._process_pooled, rgb_frame)
+                futures.append((frame_path, prev_future))
                 
             except Exception as e:
                 logger.warning(f"⚠️ Error processing frame {frame_path}: {e}")
+                futures.append(None)
+        
+        for entry in futures:
+            if entry is None:
+                yield None
                 continue
+            frame_path, future = entry
+            try:
+                yield future.result()
+            except Exception as e:
+                logger.warning(f"⚠️ Error processing frame {frame_path}: {e}")
+                yield None
+    
+    def _dhash(self, rgb_frame: np.ndarray) -> int:
+        """64-bit difference hash: sign of horizontal gradients on a 9x8 grayscale thumbnail"""
+        small = cv2.resize(rgb_frame, (9, 8), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_RGB2GRAY)
+        return int.from_bytes(np.packbits(gray[:, 1:] > gray[:, :-1]).tobytes(), 'big')
+    
+    def _get_frame_executor(self) -> ThreadPoolExecutor:
+        """Thread pool plus one static-image Holistic graph and scratch buffer per worker"""
+        if self._frame_executor is None:
+            workers = self.config['frame_workers']
+            self._holistic_pool = queue.Queue()
+            for _ in range(workers):
+                holistic = self._create_holistic(static_image_mode=True,
+                                                 model_complexity=self.config.get('model_complexity_live', 0))
+                self._holistic_pool.put((holistic, self._new_scratch()))
+            self._frame_executor = ThreadPoolExecutor(max_workers=workers)
+        return self._frame_executor
+    
+    def _extract_pooled(self, frame_path: str) -> Optional[Tuple[np.ndarray, float]]:
+        """Extract one frame on a borrowed Holistic graph (MediaPipe graphs are not thread-safe)"""
+        holistic, scratch = self._holistic_pool.get()
+        try:
+            return self._extract_frame_safe(frame_path, holistic, scratch)
+        finally:
+            self._holistic_pool.put((holistic, scratch))
+    
+    def _process_pooled(self, rgb_frame: np.ndarray) -> Tuple[np.ndarray, float]:
+        """Run one preprocessed RGB frame on a borrowed Holistic graph"""
+        holistic, scratch = self._holistic_pool.get()
+        try:
+            return self.extract_keypoints_enhanced(holistic.process(rgb_frame), scratch)
+        finally:
+            self._holistic_pool.put((holistic, scratch))
+    
+    def _extract_frame_safe(self, frame_path: str, holistic=None, scratch=None) -> Optional[Tuple[np.ndarray, float]]:
+        """Extract one frame image, logging and skipping missing or unreadable files"""
+        try:
+            if not os.path.exists(frame_path):
+                logger.warning(f"⚠️ Frame not found: {frame_path}")
+                return None
+            
+            return self._extract_from_path(frame_path, holistic, scratch)
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Error processing frame {frame_path}: {e}")
+            return None
+    
+    def _extract_from_path(self, frame_path: str, holistic=None, scratch=None) -> Optional[Tuple[np.ndarray, float]]:
+        """Decode and extract one frame image, consulting the pose cache when enabled"""
+        # Pooled workers bring their own buffers; the shared ones are single-threaded
+        shared = scratch is None
+        holistic = holistic or self.holistic
         
-        if not raw_sequences:
-            return self._create_error_response("No valid frames processed from sequence")
+        if self.pose_cache_dir is None:
+            frame, is_rgb = self._read_frame(frame_path)
+            if frame is None:
+                return None
+            results = holistic.process(self._preprocess_frame(frame, reuse_buffers=shared, is_rgb=is_rgb))
+            return self.extract_keypoints_enhanced(results, scratch)
         
-        return self._finalize_processing(raw_sequences, quality_scores, {
-            'source': 'frame_sequence',
-            'input_frames': len(frame_paths),
-            'processed_frames': valid_frames,
-            'selection_method': 'quality_based'
-        })
+        with open(frame_path, 'rb') as f:
+            frame_bytes = f.read()
+        
+        # Pooled graphs are static-image; the others are tracking graphs. Graphs passed in
+        # (pool or live graph) run the live complexity, the default one the main complexity.
+        complexity = self.config['model_complexity'] if holistic is self.holistic else self.config['model_complexity_live']
+        key = hashlib.blake2b(self._pose_cache_settings(not shared, complexity), digest_size=16, person=b'frame')
+        key.update(frame_bytes)
+        key = key.hexdigest()
+        
+        # Cache entry: 288 features followed by the quality score
+        cached = self._load_cached_pose(key)
+        if cached is not None:
+            return cached[:-1], float(cached[-1])
+        
+        is_rgb = _IMREAD_RGB is not None
+        frame = cv2.imdecode(np.frombuffer(frame_bytes, dtype=np.uint8), _IMREAD_RGB if is_rgb else cv2.IMREAD_COLOR)
+        if frame is None:
+            return None
+        results = holistic.process(self._preprocess_frame(frame, reuse_buffers=shared, is_rgb=is_rgb))
+        features, quality = self.extract_keypoints_enhanced(results, scratch)
+        self._save_cached_pose(key, np.append(features, np.float32(quality)).astype(np.float32))
+        return features, quality
+    
+    def _pose_cache_settings(self, static_image_mode: bool, model_complexity: int) -> bytes:
+        """Extraction settings folded into every pose cache key, so a config change misses the cache"""
+        uses_tasks = bool(self.config.get('tasks_model_dir')) and self._tasks_available
+        return repr((
+            _POSE_CACHE_VERSION,
+            static_image_mode,
+            model_complexity,
+            self.config.get('min_detection_confidence', 0.7),
+            self.config.get('min_tracking_confidence', 0.7),
+            self.config.get('use_face_model', True),
+            str(self.config['tasks_model_dir']) if uses_tasks else None,
+            self.config.get('use_gpu_delegate', True) if uses_tasks else None
+        )).encode()
+    
+    def _load_cached_pose(self, key: str) -> Optional[np.ndarray]:
+        """Read a pose cache entry, or None when it is missing or unreadable"""
+        try:
+            return np.load(self.pose_cache_dir / f"{key}.npy")
+        except (OSError, ValueError, EOFError):
+            return None
+    
+    def _save_cached_pose(self, key: str, entry: np.ndarray):
+        """Write a pose cache entry atomically
+        
+        Worker processes share the cache directory, so the entry is written to a private
+        temporary file and renamed into place; readers never see a partial .npy.
+        """
+        cache_path = self.pose_cache_dir / f"{key}.npy"
+        tmp_path = cache_path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                np.save(f, entry)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not write pose cache entry {cache_path}: {e}")
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+    
+    @staticmethod
+    def _reduce_factor(width: int) -> int:
+        """Largest JPEG downscale factor (1, 2, 4 or 8) that keeps the width at or above 640px"""
+        factor = 1
+        while factor < 8 and width >= 640 * factor * 2:
+            factor *= 2
+        return factor
     
-    def _preprocess_frame(self, frame: np.ndarray) -> np.ndarray:
-        """Standardized frame preprocessing"""
+    def _read_frame(self, frame_path: str, reduce: int = 1) -> Tuple[Optional[np.ndarray], bool]:
+        """Decode a frame image, returning (frame, is_rgb)
+        
+        Decoders that can emit RGB do so, saving a full-image channel swap in preprocessing.
+        libjpeg-turbo reads the size from the header and scales large frames toward the 640px
+        working width in the DCT domain; without it, reduce (a factor from _reduce_factor)
+        requests OpenCV's reduced-size (BGR) decode for callers that know the frame size.
+        """
+        if self.jpeg is not None:
+            try:
+                with open(frame_path, 'rb') as f:
+                    data = f.read()
+                width = self.jpeg.decode_header(data)[0]
+                scaling = (1, self._reduce_factor(width))
+                return self.jpeg.decode(data, pixel_format=TJPF_RGB, scaling_factor=scaling), True
+            except Exception:
+                pass  # Not a JPEG (e.g. PNG) - let OpenCV handle it
+        if reduce > 1:
+            return cv2.imread(frame_path, _IMREAD_REDUCED[reduce]), False
+        if _IMREAD_RGB is not None:
+            return cv2.imread(frame_path, _IMREAD_RGB), True
+        return cv2.imread(frame_path, cv2.IMREAD_COLOR), False
+    
+    def _preprocess_frame(self, frame: np.ndarray, reuse_buffers: bool = True, is_rgb: bool = False) -> np.ndarray:
+        """Standardized frame preprocessing
+        
+        With reuse_buffers the result lives in per-extractor scratch buffers and is
+        only valid until the next call; pipelines that queue frames must pass False.
+        Frames already decoded to RGB (is_rgb) skip the BGR->RGB conversion.
+        """
         # Resize if too large (for consistency and speed)
         h, w = frame.shape[:2]
         if w > 640:
             scale = 640.0 / w
             new_w, new_h = int(w * scale), int(h * scale)
-            frame = cv2.resize(frame, (new_w, new_h))
+            resize_dst = None
+            if reuse_buffers:
+                if self._resize_buf is None or self._resize_buf.shape != (new_h, new_w, 3):
+                    self._resize_buf = np.empty((new_h, new_w, 3), dtype=np.uint8)
+                self._resize_buf.flags.writeable = True
+                resize_dst = self._resize_buf
+            frame = cv2.resize(frame, (new_w, new_h), dst=resize_dst, interpolation=cv2.INTER_AREA)
+        
+        if is_rgb:
+            frame.flags.writeable = False
+            return frame
         
         # Convert to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        rgb_dst = None
+        if reuse_buffers:
+            if self._rgb_buf is None or self._rgb_buf.shape != frame.shape:
+                self._rgb_buf = np.empty(frame.shape, dtype=np.uint8)
+            self._rgb_buf.flags.writeable = True
+            rgb_dst = self._rgb_buf
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb_dst)
         rgb_frame.flags.writeable = False
         
         return rgb_frame
@@ -321,35 +1125,17 @@ class EnhancedPoseExtractor:
         
         middle_frames = max(int(max_frames * 0.7), 1)
         edge_frames = max_frames - middle_frames
+        edge_per_side = edge_frames // 2
         
-        indices = []
-        
-        # Middle section (dense sampling)
-        if middle_frames > 0:
-            middle_step = max(1, (end_idx - start_idx) // middle_frames)
-            for i in range(start_idx, end_idx, middle_step):
-                indices.append(i)
-                if len(indices) >= middle_frames:
-                    break
-        
-        # Edge frames (sparse sampling)
-        if edge_frames > 0:
-            edge_per_side = edge_frames // 2
-            
-            # Beginning frames
-            for i in range(0, start_idx, max(1, start_idx // edge_per_side)):
-                indices.append(i)
-                if len(indices) >= max_frames:
-                    break
-            
-            # End frames
-            if len(indices) < max_frames:
-                for i in range(end_idx, total_frames, max(1, (total_frames - end_idx) // edge_per_side)):
-                    indices.append(i)
-                    if len(indices) >= max_frames:
-                        break
+        # Middle section dense, edges sparse; evenly spaced within each segment
+        indices = np.concatenate([
+            np.linspace(0, start_idx - 1, edge_per_side),
+            np.linspace(start_idx, end_idx - 1, middle_frames),
+            np.linspace(end_idx, total_frames - 1, edge_frames - edge_per_side)
+        ])
+        indices = np.unique(np.clip(np.round(indices), 0, total_frames - 1).astype(np.int64))
         
-        return sorted(indices[:max_frames])
+        return indices[:max_frames].tolist()
     
     def _select_best_frames(self, frame_paths: List[str], max_frames: int) -> List[str]:
         """Select best frames based on timestamps and quality estimation"""
@@ -362,34 +1148,31 @@ class EnhancedPoseExtractor:
         indices = [int(i * step) for i in range(max_frames)]
         return [frame_paths[i] for i in indices if i < len(frame_paths)]
     
-    def _apply_normalization(self, sequences: List[List[float]]) -> Tuple[List[List[float]], bool]:
+    def _apply_normalization(self, sequences: np.ndarray) -> Tuple[np.ndarray, bool]:
         """Apply normalization with comprehensive logging"""
         if not self.normalization_loaded:
             logger.error("❌ Normalization parameters not loaded!")
             return sequences, False
         
         try:
-            # Convert to numpy for processing
-            data = np.array(sequences, dtype=np.float32)
+            data = np.ascontiguousarray(sequences, dtype=np.float32)
             
-            # Apply normalization: (x - mean) / std
-            normalized = (data - self.feature_means) / self.feature_stds
-            
-            # Clip extreme values to prevent instability
-            normalized = np.clip(normalized, -5.0, 5.0)
+            # Apply normalization (x - mean) / std and clip extreme values in one pass
+            normalized = self._norm_fn(data, np.empty_like(data))
             
             # Log normalization effect
-            logger.info("🔧 Normalization applied:")
-            logger.info(f"   Before: mean={data.mean():.4f}, std={data.std():.4f}")
-            logger.info(f"   After: mean={normalized.mean():.4f}, std={normalized.std():.4f}")
+            if DEBUG:
+                logger.info("🔧 Normalization applied:")
+                logger.info(f"   Before: mean={data.mean():.4f}, std={data.std():.4f}")
+                logger.info(f"   After: mean={normalized.mean():.4f}, std={normalized.std():.4f}")
             
-            return normalized.tolist(), True
+            return normalized, True
             
         except Exception as e:
             logger.error(f"❌ Normalization failed: {e}")
             return sequences, False
     
-    def _finalize_processing(self, raw_sequences: List[List[float]], quality_scores: List[float], metadata: Dict) -> Dict:
+    def _finalize_processing(self, raw_sequences: np.ndarray, quality_scores: np.ndarray, metadata: Dict) -> Dict:
         """Finalize processing with quality filtering and normalization"""
         
         # Quality filtering
@@ -412,13 +1195,13 @@ class EnhancedPoseExtractor:
         final_sequences = self._adjust_sequence_length(normalized_sequences, target_length)
         
         # Calculate final statistics
-        avg_quality = np.mean(filtered_scores) if filtered_scores else 0.0
+        avg_quality = float(filtered_scores.mean()) if len(filtered_scores) else 0.0
         
         result = {
             'success': True,
-            'pose_sequence': final_sequences,
+            'pose_sequence': np.ascontiguousarray(final_sequences, dtype=np.float32),
             'sequence_length': len(final_sequences),
-            'feature_dimension': len(final_sequences[0]) if final_sequences else 0,
+            'feature_dimension': final_sequences.shape[1] if len(final_sequences) else 0,
             'normalized': is_normalized,
             'quality_score': avg_quality,
             'processing_stats': {
@@ -426,37 +1209,37 @@ class EnhancedPoseExtractor:
                 'filtered_frames': len(filtered_sequences),
                 'final_frames': len(final_sequences),
                 'average_quality': avg_quality,
-                'min_quality': min(filtered_scores) if filtered_scores else 0.0,
-                'max_quality': max(filtered_scores) if filtered_scores else 0.0
+                'min_quality': float(filtered_scores.min()) if len(filtered_scores) else 0.0,
+                'max_quality': float(filtered_scores.max()) if len(filtered_scores) else 0.0
             },
             'metadata': metadata
         }
         
         logger.info("✅ Processing completed successfully")
-        logger.info(f"   Final sequence: {len(final_sequences)} frames × {len(final_sequences[0]) if final_sequences else 0} features")
-        logger.info(f"   Average quality: {avg_quality:.3f}")
-        logger.info(f"   Normalized: {is_normalized}")
+        if DEBUG:
+            logger.info(f"   Final sequence: {len(final_sequences)} frames × {final_sequences.shape[1] if len(final_sequences) else 0} features")
+            logger.info(f"   Average quality: {avg_quality:.3f}")
+            logger.info(f"   Normalized: {is_normalized}")
         
         return result
     
-    def _apply_quality_filtering(self, sequences: List[List[float]], scores: List[float]) -> Tuple[List[List[float]], List[float]]:
+    def _apply_quality_filtering(self, sequences: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """Filter sequences based on quality scores"""
-        if not scores:
+        if not len(scores):
             return sequences, scores
         
-        threshold = self.config['quality_threshold']
-        filtered_pairs = [(seq, score) for seq, score in zip(sequences, scores) if score >= threshold]
+        mask = scores >= self.config['quality_threshold']
         
-        if not filtered_pairs:
-            # If no frames meet threshold, keep best 50%
-            sorted_pairs = sorted(zip(sequences, scores), key=lambda x: x[1], reverse=True)
-            keep_count = max(1, len(sorted_pairs) // 2)
-            filtered_pairs = sorted_pairs[:keep_count]
+        if not mask.any():
+            # If no frames meet threshold, keep best 50% in temporal order
+            keep_count = max(1, len(scores) // 2)
+            idx = np.argpartition(scores, -keep_count)[-keep_count:]
+            idx.sort()
+            return sequences[idx], scores[idx]
         
-        filtered_sequences, filtered_scores = zip(*filtered_pairs) if filtered_pairs else ([], [])
-        return list(filtered_sequences), list(filtered_scores)
+        return sequences[mask], scores[mask]
     
-    def _adjust_sequence_length(self, sequences: List[List[float]], target_length: int) -> List[List[float]]:
+    def _adjust_sequence_length(self, sequences: np.ndarray, target_length: int) -> np.ndarray:
         """Adjust sequence to target length with smart padding/truncation"""
         if len(sequences) == target_length:
             return sequences
@@ -468,19 +1251,14 @@ class EnhancedPoseExtractor:
         # Pad with normalized zeros or repeat last frame
         padding_needed = target_length - len(sequences)
         
-        if sequences:
-            # Use normalized zero vector for padding
-            if self.normalization_loaded:
-                zero_normalized = ((-self.feature_means) / self.feature_stds).tolist()
-                zero_normalized = np.clip(zero_normalized, -5.0, 5.0).tolist()
-            else:
-                zero_normalized = [0.0] * self.config['feature_dim']
-            
-            padded_sequences = sequences + [zero_normalized] * padding_needed
+        if len(sequences):
+            # Use the precomputed normalized zero vector for padding
+            padded_sequences = np.empty((target_length, sequences.shape[1]), dtype=np.float32)
+            padded_sequences[:len(sequences)] = sequences
+            padded_sequences[len(sequences):] = self._pad_vector if self.normalization_loaded else 0.0
         else:
             # Complete fallback
-            zero_sequence = [[0.0] * self.config['feature_dim']] * target_length
-            padded_sequences = zero_sequence
+            padded_sequences = np.zeros((target_length, self.config['feature_dim']), dtype=np.float32)
         
         return padded_sequences
     
@@ -497,99 +1275,504 @@ class EnhancedPoseExtractor:
             'quality_score': 0.0
         }
 
+
+class OptimizedMediaPipePoseExtractor(EnhancedPoseExtractor):
+    """Legacy list-based interface used by training-data preparation and diagnostic scripts
+    
+    Keeps the original extraction settings and plain (x - mean) / std normalization
+    (no quality filtering, clipping or padding) so sequences match the training data.
+    """
+    
+    # Holistic settings the training data was extracted with
+    LEGACY_CONFIG = {
+        'model_complexity': 0,
+        'model_complexity_live': 0,
+        'min_detection_confidence': 0.5,
+        'min_tracking_confidence': 0.5,
+        'enable_motion_gate': False
+    }
+    
+    def __init__(self, skip_normalization_loading: bool = False, config_path: Optional[str] = None,
+                 pose_cache: bool = False):
+        self.skip_normalization = skip_normalization_loading
+        self.pose_cache = pose_cache
+        super().__init__(config_path)
+    
+    def _load_config(self, config_path: Optional[str]) -> Dict:
+        config = super()._load_config(config_path)
+        if not (config_path and os.path.exists(config_path)):
+            config.update(self.LEGACY_CONFIG)
+        if self.pose_cache:
+            config['enable_pose_cache'] = True
+        return config
+    
+    def _load_normalization_params(self):
+        super()._load_normalization_params()
+        # Multiply by the reciprocal instead of dividing every element
+        self._inv_stds = (1.0 / self.feature_stds).astype(np.float32)
+    
+    def extract_keypoints(self, results) -> np.ndarray:
+        """Extract the 288-feature vector (filled into the preallocated scratch buffer)"""
+        features, _ = self.extract_keypoints_enhanced(results)
+        return features
+    
+    def _normalize_in_place(self, seq: np.ndarray, apply_normalization: bool) -> np.ndarray:
+        """(x - mean) / std over a float32 (T, 288) array, broadcast across all frames"""
+        if apply_normalization and not self.skip_normalization and self.feature_means is not None:
+            np.subtract(seq, self.feature_means, out=seq)
+            np.multiply(seq, self._inv_stds, out=seq)
+        return seq
+    
+    def normalize_sequence(self, sequence, apply_normalization: bool = True):
+        """Apply (x - mean) / std to a sequence of frames when normalization is available
+        
+        Lists come back as lists; ndarrays come back as a normalized float32 copy.
+        """
+        if not apply_normalization or self.skip_normalization or self.feature_means is None:
+            return sequence
+        seq = np.array(sequence, dtype=np.float32)
+        self._normalize_in_place(seq, apply_normalization)
+        return seq if isinstance(sequence, np.ndarray) else seq.tolist()
+    
+    def _finish_sequence(self, seq: np.ndarray, apply_normalization: bool, as_array: bool):
+        """Normalize the filled (T, 288) rows and convert to lists only for list callers"""
+        seq = self._normalize_in_place(seq, apply_normalization)
+        return seq if as_array else seq.tolist()
+    
+    def extract_pose_from_video_file(self, video_path: str, max_frames: int = 30,
+                                     apply_normalization: bool = True, as_array: bool = False,
+                                     stride: int = 1):
+        """Extract max_frames frames of a video, every stride-th from the start (float32 (T, 288) array with as_array)
+        
+        Decoding and preprocessing run on a reader thread while MediaPipe runs on this one.
+        """
+        frames = self._iter_video_frames(video_path, max_frames, reuse_buffers=False, stride=stride)
+        return self._extract_from_source(self._read_ahead(frames), max_frames, apply_normalization, as_array)
+    
+    def _extract_from_source(self, rgb_frames, max_frames: int, apply_normalization: bool, as_array: bool):
+        """Run the tracking Holistic graph over preprocessed RGB frames from one clip
+        
+        Every legacy entry point feeds this loop from a frame generator, so decoding,
+        buffering and prefetching live in the generators and extraction lives here.
+        A failing frame ends the clip with the frames extracted so far.
+        """
+        seq, _ = self._extract_raw(rgb_frames, max_frames)
+        return self._finish_sequence(seq, apply_normalization, as_array)
+    
+    def _extract_raw(self, rgb_frames, max_frames: int) -> Tuple[np.ndarray, bool]:
+        """Un-normalized (T, 288) rows for one clip, and whether every frame was extracted"""
+        self._reset_tracking()
+        seq = np.empty((max_frames, 288), dtype=np.float32)
+        count = 0
+        try:
+            for rgb_frame in rgb_frames:
+                seq[count] = self.extract_keypoints(self.holistic.process(rgb_frame))
+                count += 1
+        except Exception as e:
+            logger.error(f"❌ Error processing frames: {e}")
+            return seq[:count], False
+        return seq[:count], True
+    
+    def _iter_video_frames(self, video_path: str, max_frames: int, reuse_buffers: bool = True, stride: int = 1):
+        """Yield max_frames frames (every stride-th), decoded into the reused BGR buffer and preprocessed
+        
+        Skipped frames are only grabbed, never decoded to images. Pass reuse_buffers=False
+        when frames are queued (see _preprocess_frame).
+        """
+        cap = self._open_video(video_path)
+        try:
+            for frame_index in range(max_frames * stride):
+                if not cap.isOpened() or not cap.grab():
+                    break
+                if frame_index % stride:
+                    continue
+                ret, frame = cap.retrieve(self._frame_buf)
+                if not ret:
+                    break
+                self._frame_buf = frame
+                yield self._preprocess_frame(frame, reuse_buffers=reuse_buffers)
+        finally:
+            cap.release()
+    
+    def _read_ahead(self, frames, depth: int = 4):
+        """Yield frames from a generator that runs on a reader thread behind a bounded queue"""
+        frame_q = queue.Queue(maxsize=depth)
+        stop = threading.Event()
+        
+        def reader():
+            try:
+                for frame in frames:
+                    if stop.is_set():
+                        break
+                    frame_q.put(frame)
+            except Exception as e:
+                logger.error(f"❌ Error decoding frames: {e}")
+            finally:
+                frames.close()
+                frame_q.put(None)
+        
+        thread = threading.Thread(target=reader, daemon=True)
+        thread.start()
+        try:
+            while True:
+                frame = frame_q.get()
+                if frame is None:
+                    break
+                yield frame
+        finally:
+            # Unblock a reader waiting on a full queue so it can see stop and exit
+            stop.set()
+            while thread.is_alive():
+                try:
+                    frame_q.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+    
+    def _iter_path_frames(self, frame_paths: List[str]):
+        """Yield preprocessed frames for image paths in order (prefetched), skipping unreadable files"""
+        for frame_path, rgb_frame in self._prefetch_frames(frame_paths):
+            if rgb_frame is None:
+                logger.warning(f"⚠️ Cannot read frame: {frame_path}")
+                continue
+            yield rgb_frame
+    
+    def _decode_and_preprocess(self, frame_path: str, reduce: int) -> Optional[np.ndarray]:
+        frame, is_rgb = self._read_frame(frame_path, reduce)
+        return None if frame is None else self._preprocess_frame(frame, reuse_buffers=False, is_rgb=is_rgb)
+    
+    def _prefetch_frames(self, frame_paths: List[str], depth: int = 4):
+        """Yield (path, RGB frame or None) in order while the following frames decode on worker threads"""
+        if not frame_paths:
+            return
+        
+        # Frames of one video share a resolution: the first decides reduced-size decoding for the rest
+        first, is_rgb = self._read_frame(frame_paths[0])
+        reduce = 1 if first is None else self._reduce_factor(first.shape[1])
+        yield frame_paths[0], None if first is None else self._preprocess_frame(first, reuse_buffers=False, is_rgb=is_rgb)
+        
+        remaining = iter(frame_paths[1:])
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            pending = deque()
+            for frame_path in remaining:
+                pending.append((frame_path, pool.submit(self._decode_and_preprocess, frame_path, reduce)))
+                if len(pending) >= depth:
+                    break
+            
+            while pending:
+                frame_path, future = pending.popleft()
+                next_path = next(remaining, None)
+                if next_path is not None:
+                    pending.append((next_path, pool.submit(self._decode_and_preprocess, next_path, reduce)))
+                yield frame_path, future.result()
+    
+    def extract_pose_from_video_frames(self, frame_paths: List[str], max_frames: int = 30,
+                                       apply_normalization: bool = True,
+                                       parallel: bool = False, as_array: bool = False):
+        """Extract frames from a directory listing of extracted video frames (in order)
+        
+        Returns lists of floats, or the float32 (T, 288) array itself with as_array.
+        parallel shards the frames over the static-image Holistic pool (one graph per
+        frame_workers thread, results kept in frame order; needs frame_workers > 1). Those graphs do not track
+        across frames, so landmarks can differ slightly from the default sequential pass.
+        """
+        if parallel and self.config['frame_workers'] > 1:
+            seq = np.empty((max_frames, 288), dtype=np.float32)
+            count = 0
+            for extracted in self._get_frame_executor().map(self._extract_pooled, frame_paths[:max_frames]):
+                if extracted is not None:
+                    seq[count] = extracted[0]
+                    count += 1
+            return self._finish_sequence(seq[:count], apply_normalization, as_array)
+        
+        frame_paths = frame_paths[:max_frames]
+        if self.pose_cache_dir is None:
+            return self._extract_from_source(self._iter_path_frames(frame_paths),
+                                             max_frames, apply_normalization, as_array)
+        
+        # The tracking graph carries state across frames, so the whole clip is one cache entry
+        key = self._clip_cache_key(frame_paths)
+        seq = self._load_cached_pose(key)
+        if seq is None:
+            seq, complete = self._extract_raw(self._iter_path_frames(frame_paths), max_frames)
+            if complete:
+                self._save_cached_pose(key, seq)
+        return self._finish_sequence(seq, apply_normalization, as_array)
+    
+    def _clip_cache_key(self, frame_paths: List[str]) -> str:
+        """BLAKE2b over the extraction settings and every frame file's bytes, in order"""
+        key = hashlib.blake2b(self._pose_cache_settings(False, self.config['model_complexity']),
+                              digest_size=16, person=b'clip')
+        for frame_path in frame_paths:
+            try:
+                with open(frame_path, 'rb') as f:
+                    frame_bytes = f.read()
+            except OSError:
+                frame_bytes = b''  # Skipped as unreadable by the extraction pass too
+            key.update(len(frame_bytes).to_bytes(8, 'little'))
+            key.update(frame_bytes)
+        return key.hexdigest()
+
+
+# Name used by the original training and test scripts
+MediaPipePoseExtractor = OptimizedMediaPipePoseExtractor
+
+
+def _to_builtin(obj):
+    """json fallback for numpy values left in results"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def encode_pose_sequence(result: Dict) -> Dict:
+    """Replace pose_sequence with base64 float16 bytes plus its shape (values are clipped to [-5, 5])"""
+    sequence = np.asarray(result['pose_sequence'], dtype=np.float16)
+    result['pose_sequence'] = base64.b64encode(sequence.tobytes()).decode('ascii')
+    result['pose_sequence_dtype'] = 'float16'
+    result['pose_sequence_shape'] = list(sequence.shape)
+    return result
+
+
+def decode_pose_sequence(data: Dict) -> np.ndarray:
+    """Inverse of encode_pose_sequence; plain list payloads are returned as float32 arrays"""
+    sequence = data['pose_sequence']
+    if data.get('pose_sequence_dtype') == 'float16' and isinstance(sequence, str):
+        raw = np.frombuffer(base64.b64decode(sequence), dtype=np.float16)
+        return raw.reshape(data['pose_sequence_shape']).astype(np.float32)
+    return np.asarray(sequence, dtype=np.float32)
+
+
+def dumps_result(result: Dict) -> bytes:
+    """Serialize a result dict (ndarray pose_sequence included) to compact UTF-8 JSON"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(result, ensure_ascii=False, separators=(',', ':'), default=_to_builtin).encode('utf-8')
+
+
+def loads_json(data):
+    """Parse a JSON request (str or bytes) with orjson when available"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Global extractor instances
+global_extractor = None
+global_legacy_extractor = None
+
+
+def get_extractor() -> EnhancedPoseExtractor:
+    """Get or create global extractor instance (keeps the Holistic graph warm)"""
+    global global_extractor
+    if global_extractor is None:
+        global_extractor = EnhancedPoseExtractor()
+    return global_extractor
+
+
+def get_legacy_extractor() -> OptimizedMediaPipePoseExtractor:
+    """Get or create the global legacy extractor instance"""
+    global global_legacy_extractor
+    if global_legacy_extractor is None:
+        global_legacy_extractor = OptimizedMediaPipePoseExtractor()
+    return global_legacy_extractor
+
+
+def extract_pose_landmarks(video_path: str, max_frames: int = 30) -> np.ndarray:
+    """Wrapper for external calls: normalized legacy sequence for one video"""
+    extractor = get_legacy_extractor()
+    return extractor.extract_pose_from_video_file(video_path, max_frames, apply_normalization=True, as_array=True)
+
+
+def process_request(extractor: EnhancedPoseExtractor, input_data: Dict) -> Dict:
+    """Resolve the processing mode from a request dict and run it"""
+    # Determine processing mode and input from the data
+    mode = None
+    processing_input = None
+
+    # Handle different input formats for backward compatibility
+    if 'mode' in input_data:
+        mode = input_data['mode']
+        processing_input = input_data.get('data')
+    elif 'data' in input_data:
+        # Try to determine mode from data structure
+        data_str = input_data['data']
+        if isinstance(data_str, str):
+            try:
+                parsed_data = loads_json(data_str)
+                if isinstance(parsed_data, list) and len(parsed_data) > 0:
+                    if isinstance(parsed_data[0], str):
+                        mode = 'frames'
+                        processing_input = parsed_data
+                    else:
+                        mode = 'frames'
+                        processing_input = parsed_data
+            except:
+                # If parsing fails, treat as video path
+                mode = 'video'
+                processing_input = data_str
+        else:
+            processing_input = data_str
+            mode = 'frames' if isinstance(data_str, list) else 'video'
+    else:
+        # Direct format
+        if 'video_path' in input_data:
+            mode = 'video'
+            processing_input = input_data['video_path']
+        elif 'frame_paths' in input_data:
+            mode = 'frames'
+            processing_input = input_data['frame_paths']
+        else:
+            raise ValueError("Cannot determine processing mode from input data")
+
+    # Process based on mode
+    if mode == 'video':
+        if isinstance(processing_input, str):
+            video_path = processing_input
+        else:
+            video_path = str(processing_input)
+
+        max_frames = input_data.get('max_frames', 30)
+        if input_data.get('threaded', False):
+            result = extractor.process_video_file_threaded(video_path, max_frames)
+        else:
+            result = extractor.process_video_file(video_path, max_frames)
+        logger.info(f"Processed video: {video_path}")
+
+    elif mode == 'frames':
+        if isinstance(processing_input, str):
+            try:
+                frame_paths = loads_json(processing_input)
+            except:
+                frame_paths = [processing_input]
+        elif isinstance(processing_input, list):
+            frame_paths = processing_input
+        else:
+            raise ValueError("Invalid frame paths format")
+
+        max_frames = input_data.get('max_frames', 30)
+        result = extractor.process_frame_sequence(frame_paths, max_frames)
+        logger.info(f"Processed {len(frame_paths)} frame paths")
+
+    else:
+        raise ValueError(f"Unknown mode: {mode}. Use 'video' or 'frames'")
+    
+    pose_dtype = input_data.get('pose_sequence_dtype', extractor.config['pose_sequence_dtype'])
+    if pose_dtype == 'float16' and result.get('success'):
+        encode_pose_sequence(result)
+    
+    return result
+
+
+def _read_request_lines(fd: int):
+    """Yield (line, more_buffered) for each newline-delimited request on fd
+    
+    Reads the raw descriptor instead of sys.stdin so the worker knows exactly which
+    requests it has already consumed from the pipe (needed before re-exec).
+    """
+    pending = b""
+    while True:
+        newline = pending.find(b"\n")
+        if newline >= 0:
+            line, pending = pending[:newline], pending[newline + 1:]
+            yield line, bool(pending)
+            continue
+        
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            if pending:
+                yield pending, False
+            return
+        pending += chunk
+
+
+def _limit_memory(max_memory_mb: int):
+    """Hard-cap the worker's address space so a leaking graph fails with MemoryError instead of OOM"""
+    try:
+        import resource
+    except ImportError:
+        logger.warning("⚠️ Memory limit not supported on this platform")
+        return
+    limit = max_memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    logger.info(f"🔒 Address space limited to {max_memory_mb} MB")
+
+
+def serve(extractor: EnhancedPoseExtractor, recycle_after: int = 0):
+    """Answer newline-delimited JSON requests from stdin with one JSON line each on stdout
+    
+    With recycle_after > 0 the worker re-executes itself after that many requests, once no
+    further request is already buffered, to shed native memory OpenCV and MediaPipe do not return.
+    """
+    logger.info("🔄 Serving newline-delimited JSON requests on stdin")
+    
+    # Native crashes inside MediaPipe/OpenCV still leave a Python traceback on stderr
+    faulthandler.enable()
+    
+    requests_served = 0
+    for line, more_buffered in _read_request_lines(sys.stdin.fileno()):
+        line = line.strip()
+        if not line:
+            continue
+        
+        try:
+            result = process_request(extractor, loads_json(line))
+        except Exception as e:
+            result = extractor._create_error_response(str(e))
+        
+        sys.stdout.buffer.write(dumps_result(result) + b"\n")
+        sys.stdout.flush()
+        
+        requests_served += 1
+        if recycle_after and requests_served >= recycle_after and not more_buffered:
+            logger.info(f"♻️ Recycling worker after {requests_served} requests")
+            extractor.close()
+            os.execv(sys.executable, [sys.executable] + sys.argv)
+
 def main():
     """Main function with both file-based and command-line interfaces"""
     parser = argparse.ArgumentParser(description='Enhanced Pose Extractor')
     parser.add_argument('input_file', nargs='?', help='Input file path (for file-based mode)')
     parser.add_argument('output_file', nargs='?', help='Output file path (for file-based mode)')
     parser.add_argument('--legacy', action='store_true', help='Use legacy command-line mode')
+    parser.add_argument('--serve', action='store_true', help='Serve JSON requests from stdin with a persistent extractor')
+    parser.add_argument('--recycle-after', type=int, default=100,
+                        help='Restart the --serve worker after this many requests (0 disables)')
+    parser.add_argument('--max-memory-mb', type=int, default=None,
+                        help='Address space limit for the --serve worker')
+    parser.add_argument('--frame-workers', type=int, default=min(os.cpu_count() or 1, 4),
+                        help='Holistic graphs for parallel frame extraction in the --serve worker')
     
     args = parser.parse_args()
     
     try:
         # Determine operation mode
-        if args.input_file and args.output_file and not args.legacy:
+        if args.serve:
+            if args.max_memory_mb:
+                _limit_memory(args.max_memory_mb)
+            # Only the long-lived worker amortizes the extra Holistic graphs of the frame pool;
+            # one-shot calls keep the single-graph default
+            extractor = get_extractor()
+            extractor.config['frame_workers'] = max(args.frame_workers, 1)
+            serve(extractor, recycle_after=args.recycle_after)
+            
+        elif args.input_file and args.output_file and not args.legacy:
             # FILE-BASED MODE (New approach to fix "argument list too long")
             logger.info("🔄 Using file-based input/output mode")
             
             # Read input data
-            with open(args.input_file, 'r', encoding='utf-8') as f:
-                input_data = json.load(f)
+            with open(args.input_file, 'rb') as f:
+                input_data = loads_json(f.read())
             
             # Initialize extractor
-            extractor = EnhancedPoseExtractor()
-            
-            # Determine processing mode and input from the data
-            mode = None
-            processing_input = None
+            extractor = get_extractor()
             
-            # Handle different input formats for backward compatibility
-            if 'mode' in input_data:
-                mode = input_data['mode']
-                processing_input = input_data.get('data')
-            elif 'data' in input_data:
-                # Try to determine mode from data structure
-                data_str = input_data['data']
-                if isinstance(data_str, str):
-                    try:
-                        parsed_data = json.loads(data_str)
-                        if isinstance(parsed_data, list) and len(parsed_data) > 0:
-                            if isinstance(parsed_data[0], str):
-                                mode = 'frames'
-                                processing_input = parsed_data
-                            else:
-                                mode = 'frames'
-                                processing_input = parsed_data
-                    except:
-                        # If parsing fails, treat as video path
-                        mode = 'video'
-                        processing_input = data_str
-                else:
-                    processing_input = data_str
-                    mode = 'frames' if isinstance(data_str, list) else 'video'
-            else:
-                # Direct format
-                if 'video_path' in input_data:
-                    mode = 'video'
-                    processing_input = input_data['video_path']
-                elif 'frame_paths' in input_data:
-                    mode = 'frames'
-                    processing_input = input_data['frame_paths']
-                else:
-                    raise ValueError("Cannot determine processing mode from input data")
-            
-            # Process based on mode
-            if mode == 'video':
-                if isinstance(processing_input, str):
-                    video_path = processing_input
-                else:
-                    video_path = str(processing_input)
-                
-                max_frames = input_data.get('max_frames', 30)
-                result = extractor.process_video_file(video_path, max_frames)
-                logger.info(f"Processed video: {video_path}")
-                
-            elif mode == 'frames':
-                if isinstance(processing_input, str):
-                    try:
-                        frame_paths = json.loads(processing_input)
-                    except:
-                        frame_paths = [processing_input]
-                elif isinstance(processing_input, list):
-                    frame_paths = processing_input
-                else:
-                    raise ValueError("Invalid frame paths format")
-                
-                max_frames = input_data.get('max_frames', 30)
-                result = extractor.process_frame_sequence(frame_paths, max_frames)
-                logger.info(f"Processed {len(frame_paths)} frame paths")
-                
-            else:
-                raise ValueError(f"Unknown mode: {mode}. Use 'video' or 'frames'")
+            result = process_request(extractor, input_data)
             
             # Write output
-            with open(args.output_file, 'w', encoding='utf-8') as f:
-                json.dump(result, f, ensure_ascii=False, indent=2)
+            with open(args.output_file, 'wb') as f:
+                f.write(dumps_result(result))
             
             logger.info(f"Results written to: {args.output_file}")
             
@@ -598,10 +1781,10 @@ def main():
             logger.info("🔄 Using legacy command-line mode")
             
             if len(sys.argv) < 3:
-                print(json.dumps({
+                sys.stdout.buffer.write(dumps_result({
                     "success": False,
                     "error": "Usage: python pose_extractor.py <mode> <input> OR python pose_extractor.py <input_file> <output_file>"
-                }))
+                }) + b"\n")
                 return
             
             mode = sys.argv[1].lower()
@@ -613,7 +1796,7 @@ def main():
             if mode == "video":
                 result = extractor.process_video_file(input_data)
             elif mode == "frames":
-                frame_paths = json.loads(input_data)
+                frame_paths = loads_json(input_data)
                 result = extractor.process_frame_sequence(frame_paths)
             else:
                 result = {
@@ -621,7 +1804,8 @@ def main():
                     "error": f"Unknown mode: {mode}. Use 'video' or 'frames'"
                 }
             
-            print(json.dumps(result, ensure_ascii=False))
+            sys.stdout.buffer.write(dumps_result(result) + b"\n")
+            sys.stdout.flush()
         
     except Exception as e:
         logger.error(f"❌ Script failed: {e}")
@@ -639,10 +1823,10 @@ def main():
         
         try:
             if args.output_file:
-                with open(args.output_file, 'w', encoding='utf-8') as f:
-                    json.dump(error_result, f, ensure_ascii=False, indent=2)
+                with open(args.output_file, 'wb') as f:
+                    f.write(dumps_result(error_result))
             else:
-                print(json.dumps(error_result))
+                sys.stdout.buffer.write(dumps_result(error_result) + b"\n")
         except:
             pass
         
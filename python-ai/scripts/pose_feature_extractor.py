@@ -5,93 +5,119 @@ import mediapipe as mp
 import numpy as np
 import logging
 from pathlib import Path
+from landmark_packing import pack_landmarks
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class PoseFeatureExtractor:
-    def __init__(self):
+    # (offset, landmark count) of each group in the 288-feature vector, 3 coordinates per landmark
+    POSE_OFF, POSE_N = 0, 33
+    LH_OFF, HAND_N = 99, 21
+    RH_OFF = 162
+    FACE_OFF, FACE_N = 225, 21
+    
+    def __init__(self, model_complexity=0):
         self.mp_holistic = mp.solutions.holistic
+        # Lite model by default: only coarse face points are kept, so the full model buys nothing on CPU
+        self.model_complexity = model_complexity
         self.holistic = None
+        # Per-image graph for frame sets that are not a continuous clip (created on first use)
+        self.static_holistic = None
         
-    def __enter__(self):
-        self.holistic = self.mp_holistic.Holistic(
-            static_image_mode=False,
-            model_complexity=1,
+        # Feature buffer reused across frames, with an (N, 3) view per landmark group
+        self._feat_buf = np.zeros(288, dtype=np.float32)
+        self._pose_view = self._group_view(self.POSE_OFF, self.POSE_N)
+        self._lh_view = self._group_view(self.LH_OFF, self.HAND_N)
+        self._rh_view = self._group_view(self.RH_OFF, self.HAND_N)
+        self._face_view = self._group_view(self.FACE_OFF, self.FACE_N)
+        
+        # RGB conversion target, reallocated only when the frame size changes
+        self._rgb_buf = None
+        
+    def _group_view(self, offset, count):
+        return self._feat_buf[offset:offset + 3 * count].reshape(count, 3)
+        
+    def _create_holistic(self, static_image_mode):
+        return self.mp_holistic.Holistic(
+            static_image_mode=static_image_mode,
+            model_complexity=self.model_complexity,
             enable_segmentation=False,
             refine_face_landmarks=False
         )
+        
+    def __enter__(self):
+        self.holistic = self._create_holistic(static_image_mode=False)
         return self
         
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.holistic:
             self.holistic.close()
+        if self.static_holistic:
+            self.static_holistic.close()
+            self.static_holistic = None
+    
+    @staticmethod
+    def _fill_group(view, landmark_list):
+        """Write landmarks into a group view, or zero it when the group was not detected"""
+        if landmark_list is None:
+            view.fill(0.0)
+            return
+        # Gathers x, y, z from the serialized landmark list without per-landmark attribute access
+        pack_landmarks(landmark_list, view)
     
     def extract_features_from_landmarks(self, results):
         """Extract exactly 288 features to match model input"""
-        features = []
-        
         # Pose landmarks (33 points × 3 coordinates = 99 features)
-        if results.pose_landmarks:
-            for landmark in results.pose_landmarks.landmark:
-                features.extend([landmark.x, landmark.y, landmark.z])
-        else:
-            features.extend([0.0] * 99)  # 33 * 3
+        self._fill_group(self._pose_view, results.pose_landmarks)
         
         # Left hand landmarks (21 points × 3 coordinates = 63 features)  
-        if results.left_hand_landmarks:
-            for landmark in results.left_hand_landmarks.landmark:
-                features.extend([landmark.x, landmark.y, landmark.z])
-        else:
-            features.extend([0.0] * 63)  # 21 * 3
+        self._fill_group(self._lh_view, results.left_hand_landmarks)
         
         # Right hand landmarks (21 points × 3 coordinates = 63 features)
-        if results.right_hand_landmarks:
-            for landmark in results.right_hand_landmarks.landmark:
-                features.extend([landmark.x, landmark.y, landmark.z])
-        else:
-            features.extend([0.0] * 63)  # 21 * 3
-            
-        # Current total: 99 + 63 + 63 = 225 features
-        # Need 288 features, so add 63 more (likely face or additional features)
+        self._fill_group(self._rh_view, results.right_hand_landmarks)
         
         # Face landmarks (simplified - take first 21 face points × 3 = 63 features)
-        if results.face_landmarks and len(results.face_landmarks.landmark) > 21:
-            for i in range(21):  # Take first 21 face landmarks
-                landmark = results.face_landmarks.landmark[i]
-                features.extend([landmark.x, landmark.y, landmark.z])
+        face = results.face_landmarks
+        if face and len(face.landmark) > self.FACE_N:
+            self._fill_group(self._face_view, face)
         else:
-            features.extend([0.0] * 63)  # 21 * 3 padding
-            
-        # Total: 99 + 63 + 63 + 63 = 288 features ✓
+            self._face_view.fill(0.0)
         
-        if len(features) != 288:
-            logger.warning(f"Feature count mismatch: got {len(features)}, expected 288")
-            # Pad or truncate to exactly 288
-            if len(features) < 288:
-                features.extend([0.0] * (288 - len(features)))
-            else:
-                features = features[:288]
-        
-        return np.array(features, dtype=np.float32)
+        # Total: 99 + 63 + 63 + 63 = 288 features ✓
+        return self._feat_buf.copy()
     
-    def process_image(self, image):
+    def process_image(self, image, holistic=None):
         """Process single image and return 288 features"""
         if image is None:
             return np.zeros(288, dtype=np.float32)
             
-        # Convert BGR to RGB
-        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        # Convert BGR to RGB into the reused buffer
+        if self._rgb_buf is None or self._rgb_buf.shape != image.shape:
+            self._rgb_buf = np.empty(image.shape, dtype=np.uint8)
+        self._rgb_buf.flags.writeable = True
+        rgb_image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=self._rgb_buf)
+        rgb_image.flags.writeable = False
         
         # Process with MediaPipe
-        results = self.holistic.process(rgb_image)
+        results = (holistic or self.holistic).process(rgb_image)
         
         # Extract features
         features = self.extract_features_from_landmarks(results)
         return features
     
-    def process_sequence(self, image_paths, target_frames=30):
-        """Process sequence of images and return (target_frames, 288) array"""
+    def process_sequence(self, image_paths, target_frames=30, ordered=True):
+        """Process sequence of images and return (target_frames, 288) array
+        
+        ordered=False runs every image through a static-image graph, so frames that are
+        not consecutive in time do not inherit each other's tracking state.
+        """
+        holistic = self.holistic
+        if not ordered:
+            if self.static_holistic is None:
+                self.static_holistic = self._create_holistic(static_image_mode=True)
+            holistic = self.static_holistic
+        
         sequence_features = []
         
         processed = 0
@@ -102,7 +128,7 @@ class PoseFeatureExtractor:
             try:
                 image = cv2.imread(image_path)
                 if image is not None:
-                    features = self.process_image(image)
+                    features = self.process_image(image, holistic)
                     sequence_features.append(features)
                     processed += 1
                     
@@ -1,147 +1,173 @@
-import cv2
 import numpy as np
 import json
 import os
+import multiprocessing
+from types import MappingProxyType
+from concurrent.futures import ProcessPoolExecutor
+
+from norm_kernels import standardize
+
+# Every training sequence is padded/truncated to (SEQUENCE_LENGTH, FEATURE_DIM)
+SEQUENCE_LENGTH = 30
+FEATURE_DIM = 288
+
+# OpenCV and MediaPipe are imported where extraction happens, so the training scripts
+# can use load_training_data without pulling them in
+
+# One extractor (and Holistic graph) per worker process, created by _init_worker
+_worker_extractor = None
+
+
+def _init_worker(pose_cache=True):
+    """Worker process setup: single-threaded OpenCV and this process's own Holistic graph"""
+    global _worker_extractor
+    import cv2
+    from pose_extractor import OptimizedMediaPipePoseExtractor as MediaPipePoseExtractor
+    # The pool already runs one process per core; OpenCV's own thread pool would oversubscribe them
+    cv2.setNumThreads(1)
+    _worker_extractor = MediaPipePoseExtractor(skip_normalization_loading=True, pose_cache=pose_cache)
+
+
+def _extract_one(frame_paths):
+    """Extract one video's raw pose sequence in a worker process; returns (sequence, error)"""
+    try:
+        # Extract pose sequence WITHOUT normalization during data preparation; a float32
+        # array pickles back to the parent far faster than nested lists
+        return _worker_extractor.extract_pose_from_video_frames(
+            frame_paths, apply_normalization=False, as_array=True
+        ), None
+    except Exception as e:
+        return None, str(e)
+
+
+# Full mapping for BDSLW60 (folder name -> Bangla word); read-only, shared by every preparer
+_LABELS = MappingProxyType({
+    'aam': 'আম',
+    'aaple': 'আপেল',
+    'ac': 'এসি',
+    'aids': 'এইডস',
+    'alu': 'আলু',
+    'anaros': 'আনারস',
+    'angur': 'আঙুর',
+    'apartment': 'অ্যাপার্টমেন্ট',
+    'attio': 'আত্তিও',
+    'audio cassette': 'অডিও ক্যাসেট',
+    'ayna': 'আয়না',
+    'baandej': 'ব্যান্ডেজ',
+    'baat': 'বাত',
+    'baba': 'বাবা',
+    'balti': 'বালতি',
+    'balu': 'বালু',
+    'bhai': 'ভাই',
+    'biscuts': 'বিস্কুট',
+    'bon': 'বোন',
+    'boroi': 'বড়ই',
+    'bottam': 'বোতাম',
+    'bou': 'বউ',
+    'cake': 'কেক',
+    'capsule': 'ক্যাপসুল',
+    'cha': 'চা',
+    'chacha': 'চাচা',
+    'chachi': 'চাচি',
+    'chadar': 'চাদর',
+    'chal': 'চাল',
+    'chikissha': 'চিকিৎসা',
+    'chini': 'চিনি',
+    'chips': 'চিপস',
+    'chiruni': 'চিরুনি',
+    'chocolate': 'চকলেট',
+    'chokh utha': 'চোখ উঠা',
+    'chosma': 'চশমা',
+    'churi': 'চুরি',
+    'clip': 'ক্লিপ',
+    'cream': 'ক্রিম',
+    'dada': 'দাদা',
+    'dadi': 'দাদি',
+    'daeitto': 'দায়িত্ব',
+    'dal': 'ডাল',
+    'debor': 'দেবর',
+    'denadar': 'দেনাদার',
+    'dengue': 'ডেঙ্গু',
+    'doctor': 'ডাক্তার',
+    'dongson': 'দংশন',
+    'dulavai': 'দুলাভাই',
+    'durbol': 'দুর্বল',
+    'jomoj': 'জমজ',
+    'juta': 'জুতা',
+    'konna': 'কন্যা',
+    'maa': 'মা',
+    'tattha': 'তত্ত্ব',
+    'toothpaste': 'টুথপেস্ট',
+    'tshirt': 'টিশার্ট',
+    'tubelight': 'টিউবলাইট',
+    'tupi': 'টুপি',
+    'tv': 'টিভি',
+})
 
-from pose_extractor import OptimizedMediaPipePoseExtractor as MediaPipePoseExtractor
 
 class TrainingDataPreparer:
-    def __init__(self):
-        # Skip normalization loading during data preparation
-        self.extractor = MediaPipePoseExtractor(skip_normalization_loading=True)
-
-        # Full mapping for BDSLW60 (folder name -> Bangla word)
-        self.labels = {
-            'aam': 'আম',
-            'aaple': 'আপেল',
-            'ac': 'এসি',
-            'aids': 'এইডস',
-            'alu': 'আলু',
-            'anaros': 'আনারস',
-            'angur': 'আঙুর',
-            'apartment': 'অ্যাপার্টমেন্ট',
-            'attio': 'আত্তিও',
-            'audio cassette': 'অডিও ক্যাসেট',
-            'ayna': 'আয়না',
-            'baandej': 'ব্যান্ডেজ',
-            'baat': 'বাত',
-            'baba': 'বাবা',
-            'balti': 'বালতি',
-            'balu': 'বালু',
-            'bhai': 'ভাই',
-            'biscuts': 'বিস্কুট',
-            'bon': 'বোন',
-            'boroi': 'বড়ই',
-            'bottam': 'বোতাম',
-            'bou': 'বউ',
-            'cake': 'কেক',
-            'capsule': 'ক্যাপসুল',
-            'cha': 'চা',
-            'chacha': 'চাচা',
-            'chachi': 'চাচি',
-            'chadar': 'চাদর',
-            'chal': 'চাল',
-            'chikissha': 'চিকিৎসা',
-            'chini': 'চিনি',
-            'chips': 'চিপস',
-            'chiruni': 'চিরুনি',
-            'chocolate': 'চকলেট',
-            'chokh utha': 'চোখ উঠা',
-            'chosma': 'চশমা',
-            'churi': 'চুরি',
-            'clip': 'ক্লিপ',
-            'cream': 'ক্রিম',
-            'dada': 'দাদা',
-            'dadi': 'দাদি',
-            'daeitto': 'দায়িত্ব',
-            'dal': 'ডাল',
-            'debor': 'দেবর',
-            'denadar': 'দেনাদার',
-            'dengue': 'ডেঙ্গু',
-            'doctor': 'ডাক্তার',
-            'dongson': 'দংশন',
-            'dulavai': 'দুলাভাই',
-            'durbol': 'দুর্বল',
-            'jomoj': 'জমজ',
-            'juta': 'জুতা',
-            'konna': 'কন্যা',
-            'maa': 'মা',
-            'tattha': 'তত্ত্ব',
-            'toothpaste': 'টুথপেস্ট',
-            'tshirt': 'টিশার্ট',
-            'tubelight': 'টিউবলাইট',
-            'tupi': 'টুপি',
-            'tv': 'টিভি',
-        }
+    def __init__(self, pose_cache=True):
+        # Serial-path extractor, created on first use; the process pool builds one per worker
+        self.extractor = None
+        # Re-runs over unchanged frames load landmarks from data/pose_cache instead of MediaPipe
+        self.pose_cache = pose_cache
+
+        self.labels = _LABELS
 
     def normalize_features(self, X):
-        """Apply standardization normalization to features"""
+        """Apply standardization normalization to features
+        
+        X is a list of (T, 288) sequences, or an already padded float32 (N, 30, 288)
+        array, which is then normalized in place.
+        """
         print("Applying feature normalization...")
         
         # First, ensure all sequences have the same length
-        target_length = 30  # Standard sequence length
-        feature_dim = 288   # Feature dimension per frame
-        
-        print(f"Standardizing sequence lengths to {target_length} frames...")
-        X_standardized = []
+        target_length = SEQUENCE_LENGTH  # Standard sequence length
+        feature_dim = FEATURE_DIM        # Feature dimension per frame
         
-        for i, sequence in enumerate(X):
-            if len(sequence) > target_length:
-                # Truncate to target length
-                seq_fixed = sequence[:target_length]
-            elif len(sequence) < target_length:
-                # Pad with zeros
-                padding_needed = target_length - len(sequence)
-                padding = [[0.0] * feature_dim] * padding_needed
-                seq_fixed = sequence + padding
-            else:
-                seq_fixed = sequence
+        if isinstance(X, np.ndarray) and X.dtype == np.float32 and X.shape[1:] == (target_length, feature_dim):
+            X_array = X
+        else:
+            # Fill a preallocated (N, T, F) array one typed sequence at a time: short sequences
+            # keep the zero padding, long ones are truncated, and NumPy never has to infer the
+            # shape of a nested Python list
+            print(f"Standardizing sequence lengths to {target_length} frames...")
+            X_array = np.zeros((len(X), target_length, feature_dim), dtype=np.float32)
             
-            X_standardized.append(seq_fixed)
-            
-            # Progress indicator for large datasets
-            if (i + 1) % 1000 == 0:
-                print(f"  Standardized {i + 1}/{len(X)} sequences")
+            for i, sequence in enumerate(X):
+                seq = np.asarray(sequence[:target_length], dtype=np.float32)
+                if seq.size:
+                    X_array[i, :len(seq)] = seq
+                
+                # Progress indicator for large datasets
+                if (i + 1) % 1000 == 0:
+                    print(f"  Standardized {i + 1}/{len(X)} sequences")
         
-        # Now convert to numpy array (should work without errors)
-        print("Converting to numpy array...")
-        X_array = np.array(X_standardized, dtype=np.float32)
         print(f"Standardized data shape: {X_array.shape}")
         
         # Flatten all frames to compute global statistics
         X_flat = X_array.reshape(-1, X_array.shape[-1])  # (total_frames, features)
         print(f"Flattened shape for stats: {X_flat.shape}")
         
-        # Compute mean and std for each feature
-        feature_means = X_flat.mean(axis=0)
-        feature_stds = X_flat.std(axis=0) + 1e-8  # Add small value to avoid division by zero
+        # Compute mean and std for each feature (float64 accumulation, stored as float32)
+        feature_means = X_flat.mean(axis=0, dtype=np.float64).astype(np.float32)
+        feature_stds = (X_flat.std(axis=0, dtype=np.float64) + 1e-8).astype(np.float32)  # Add small value to avoid division by zero
         
         print(f"Feature means range: {feature_means.min():.6f} to {feature_means.max():.6f}")
         print(f"Feature stds range: {feature_stds.min():.6f} to {feature_stds.max():.6f}")
         
-        # Apply normalization to all sequences
+        # Apply normalization to all frames at once, in place over the flattened view
         print("Applying normalization...")
-        X_normalized = (X_array - feature_means) / feature_stds
-        
-        # Save normalization parameters
-        normalization_params = {
-            'feature_means': feature_means.tolist(),
-            'feature_stds': feature_stds.tolist(),
-            'feature_dim': len(feature_means),
-            'sequence_length': target_length
-        }
+        standardize(X_flat, feature_means, feature_stds, X_flat)
+        X_normalized = X_array
         
-        # Save to multiple locations for easy access
+        # Save normalization parameters (the extractors and predictor load only the .npy files)
         os.makedirs('../data', exist_ok=True)
-        with open('../data/normalization_params.json', 'w') as f:
-            json.dump(normalization_params, f, indent=2)
-        
-        # Also save as numpy arrays for faster loading
         np.save('../data/feature_means.npy', feature_means)
         np.save('../data/feature_stds.npy', feature_stds)
         
         print("✅ Normalization parameters saved to:")
-        print("  - ../data/normalization_params.json")
         print("  - ../data/feature_means.npy")
         print("  - ../data/feature_stds.npy")
         
@@ -153,63 +179,104 @@ class TrainingDataPreparer:
         print(f"  Std: {X_normalized_flat.std():.6f} (should be ~1)")
         print(f"  Range: {X_normalized_flat.min():.6f} to {X_normalized_flat.max():.6f}")
         
-        return X_normalized.tolist()
+        return X_normalized
 
-    def prepare_from_extracted_frames(self, frames_root_dir, output_file):
-        X, y, labels = [], [], []
+    def _extract_serial(self, frame_paths):
+        """Single-process counterpart of _extract_one using this preparer's extractor"""
+        try:
+            if self.extractor is None:
+                from pose_extractor import OptimizedMediaPipePoseExtractor as MediaPipePoseExtractor
+                # Skip normalization loading during data preparation
+                self.extractor = MediaPipePoseExtractor(skip_normalization_loading=True,
+                                                        pose_cache=self.pose_cache)
+            return self.extractor.extract_pose_from_video_frames(
+                frame_paths, apply_normalization=False,  # KEY: Don't normalize during extraction
+                as_array=True
+            ), None
+        except Exception as e:
+            return None, str(e)
+
+    def prepare_from_extracted_frames(self, frames_root_dir, output_file, workers=None):
+        y, labels = [], []
         label_counts = {}
+        workers = workers or os.cpu_count() or 1
+
+        # scandir entries carry the file type from the directory listing, so the
+        # directory check costs no extra stat() per entry
+        videos = []
+        with os.scandir(frames_root_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+
+                # Get frame files
+                with os.scandir(entry.path) as frame_entries:
+                    frame_paths = sorted(f.path for f in frame_entries if f.name.endswith('.jpg'))
 
-        for video_dir in os.listdir(frames_root_dir):
-            video_path = os.path.join(frames_root_dir, video_dir)
-            if not os.path.isdir(video_path):
-                continue
-
-            # Get frame files
-            frame_files = sorted(
-                [f for f in os.listdir(video_path) if f.endswith('.jpg')]
-            )
-            frame_paths = [os.path.join(video_path, f) for f in frame_files]
-
-            if len(frame_paths) < 10:
-                continue
-
-            # Extract pose sequence WITHOUT normalization during data preparation
-            try:
-                pose_sequence = self.extractor.extract_pose_from_video_frames(
-                    frame_paths, apply_normalization=False  # KEY: Don't normalize during extraction
-                )
+                if len(frame_paths) < 10:
+                    continue
+
+                videos.append((entry.name, frame_paths))
+
+        # Videos are independent: spread them over worker processes, each with its own
+        # Holistic graph. Results come back in directory order. Spawned workers avoid
+        # forking this process's running MediaPipe threads.
+        all_frame_paths = [frame_paths for _, frame_paths in videos]
+        if workers > 1 and len(videos) > 1:
+            executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                           initializer=_init_worker, initargs=(self.pose_cache,))
+            results = executor.map(_extract_one, all_frame_paths, chunksize=4)
+        else:
+            executor = None
+            results = map(self._extract_serial, all_frame_paths)
+
+        # Each result is padded straight into its row as it arrives, so only one dense
+        # array is ever held (no list of per-video sequences next to it)
+        X_array = np.zeros((len(videos), SEQUENCE_LENGTH, FEATURE_DIM), dtype=np.float32)
+        num_samples = 0
+
+        try:
+            for (video_dir, _), (pose_sequence, error) in zip(videos, results):
+                if error is not None:
+                    print(f"Error processing {video_dir}: {error}")
+                    continue
                 if len(pose_sequence) > 0:
                     # Improved label extraction: use folder name before first underscore
                     main_word = video_dir.split('_')[0].lower()
                     label = self.labels.get(main_word, 'অজানা')
-                    X.append(pose_sequence)
+                    X_array[num_samples, :min(len(pose_sequence), SEQUENCE_LENGTH)] = pose_sequence[:SEQUENCE_LENGTH]
+                    num_samples += 1
                     y.append(label)
                     labels.append(label)
                     label_counts[label] = label_counts.get(label, 0) + 1
                     print(f"Processed {video_dir}: {len(pose_sequence)} frames -> {label}")
-            except Exception as e:
-                print(f"Error processing {video_dir}: {e}")
-                continue
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
         # Apply normalization here
-        print(f"\nApplying normalization to {len(X)} sequences...")
-        X_normalized = self.normalize_features(X)
+        print(f"\nApplying normalization to {num_samples} sequences...")
+        X_normalized = self.normalize_features(X_array[:num_samples])
+
+        # Save the normalized features as a raw float32 .npy next to a small JSON sidecar
+        # holding labels and metadata; loaders follow 'data_file' and memory-map the array
+        data_file = os.path.splitext(output_file)[0] + '_X.npy'
+        np.save(data_file, X_normalized)
 
-        # Save training data with normalized features
         training_data = {
-            'X': X_normalized,
+            'data_file': os.path.basename(data_file),
             'y': y,
             'labels': list(set(labels)),
             'num_samples': len(X_normalized),
             'num_classes': len(set(labels)),
             'normalized': True,  # Flag to indicate data is normalized
-            'feature_dim': 288
+            'feature_dim': FEATURE_DIM
         }
 
         with open(output_file, 'w', encoding='utf-8') as f:
             json.dump(training_data, f, ensure_ascii=False, indent=2)
 
-        print(f"\n✅ Normalized training data saved to {output_file}")
+        print(f"\n✅ Normalized training data saved to {data_file} (metadata: {output_file})")
         print(f"Total samples: {len(X_normalized)}")
         print(f"Unique labels: {len(set(labels))}")
         print("Sample count per label:")
@@ -218,6 +285,19 @@ class TrainingDataPreparer:
 
         return training_data
 
+def load_training_data(json_path):
+    """Read a data set written by prepare_from_extracted_frames
+    
+    Returns the JSON sidecar dict with 'X' set to the float32 (N, 30, 288) array,
+    memory-mapped from the 'data_file' .npy next to json_path. Older data sets keep
+    X inline in the JSON and are returned as stored.
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if 'data_file' in data:
+        data['X'] = np.load(os.path.join(os.path.dirname(json_path), data['data_file']), mmap_mode='r')
+    return data
+
 def main():
     preparer = TrainingDataPreparer()
     frames_dir = "/media/sayad/Ubuntu-Data/SilentVoice_BD/uploads/frames"
@@ -2,12 +2,19 @@
 import sys, os, numpy as np
 from pose_extractor import OptimizedMediaPipePoseExtractor
 
+# Start column and width of the LH / RH / POSE / FACE blocks in the 288-feature vector
+BLOCKS = (("LH", 0, 63), ("RH", 63, 63), ("POSE", 126, 132), ("FACE", 258, 30))
+BLOCK_STARTS = np.array([start for _, start, _ in BLOCKS])
+
 def summarize_seq(seq):
-    seq = np.array(seq)
+    seq = np.asarray(seq)
     if seq.ndim != 2:
         print(f"[WARN] Expected 2D (T,288) but got shape {seq.shape}")
         return
-    nonzero_per_frame = np.count_nonzero(seq, axis=1)
+    # One nonzero mask feeds both the per-frame and the per-block counts
+    mask = seq != 0
+    nonzero_per_frame = mask.sum(axis=1)
+    block_nonzero = np.add.reduceat(mask.sum(axis=0), BLOCK_STARTS)
     pct_nonzero_frames = (nonzero_per_frame > 0).mean() * 100.0
     avg_nonzero = nonzero_per_frame.mean()
     print(f"Total frames: {seq.shape[0]}")
@@ -15,13 +22,8 @@ def summarize_seq(seq):
     print(f"Frames w/ ANY nonzero: {pct_nonzero_frames:.1f}%")
     print(f"Avg nonzero features per frame: {avg_nonzero:.1f} / 288")
     # blocks
-    lh = seq[:, 0:63]
-    rh = seq[:, 63:126]
-    pose = seq[:, 126:258]
-    face = seq[:, 258:288]
-    for name, block in [("LH", lh), ("RH", rh), ("POSE", pose), ("FACE", face)]:
-        nz = np.count_nonzero(block)
-        total = block.size
+    for (name, _, width), nz in zip(BLOCKS, block_nonzero):
+        total = width * seq.shape[0]
         print(f"  {name}: {nz}/{total} nonzero ({100*nz/total:.1f}%)")
     print(f"Global min/max: {seq.min():.4f}/{seq.max():.4f}")
     print(f"Mean: {seq.mean():.4f}, Std: {seq.std():.4f}")
@@ -37,10 +39,11 @@ def main():
     extractor = OptimizedMediaPipePoseExtractor()
     print(f"\nRunning on: {video_path}")
     print("\n=== Raw Features (no normalization) ===")
-    seq = extractor.extract_pose_from_video_file(video_path, max_frames=30, apply_normalization=False)
+    seq = extractor.extract_pose_from_video_file(video_path, max_frames=30, apply_normalization=False, as_array=True)
     summarize_seq(seq)
     print("\n=== After Normalization (if params loaded) ===")
-    seq_norm = extractor.extract_pose_from_video_file(video_path, max_frames=30, apply_normalization=True)
+    # Same frames, normalized: no need to run MediaPipe over the video a second time
+    seq_norm = extractor.normalize_sequence(seq)
     summarize_seq(seq_norm)
 
 if __name__ == "__main__":
@@ -14,6 +14,7 @@ import sys
 import os
 import time
 import threading
+from functools import lru_cache
 from queue import Queue, Empty
 from typing import List, Dict, Optional, Tuple
 from pathlib import Path
@@ -23,6 +24,18 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# imdecode flags per JPEG downscale factor (libjpeg scales in the DCT domain)
+_DECODE_FLAGS = {1: cv2.IMREAD_COLOR, 2: cv2.IMREAD_REDUCED_COLOR_2,
+                 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+
+
+@lru_cache(maxsize=1)
+def get_predictor(model_path: str):
+    """Load the sign predictor once per model path; every processor and session shares it"""
+    from sign_predictor import EnhancedSignLanguagePredictor
+    return EnhancedSignLanguagePredictor(model_path)
+
+
 class RealTimeProcessor:
     """Real-time sign language processing for live streams"""
     
@@ -34,18 +47,22 @@ class RealTimeProcessor:
         self.min_frames_for_prediction = self.config.get('min_frames_for_prediction', 15)
         self.prediction_interval = self.config.get('prediction_interval_ms', 1000)  # 1 second
         
-        # Frame buffers
+        # Frame buffers: fixed-size rings of float32 pose rows and their quality scores;
+        # _head is the next slot to write, _count the number of filled slots
         self.frame_buffer = []
-        self.pose_buffer = []
-        self.quality_scores = []
+        self.pose_buffer = np.zeros((self.buffer_size, 288), dtype=np.float32)
+        self.quality_scores = np.zeros(self.buffer_size, dtype=np.float32)
+        self._head = 0
+        self._count = 0
         
         # Processing state
         self.is_processing = False
         self.last_prediction_time = 0
         self.frame_counter = 0
+        self._last_frame_ts = None
         
         # Initialize pose extractor
-        from enhanced_pose_extractor import EnhancedPoseExtractor
+        from pose_extractor import EnhancedPoseExtractor
         self.pose_extractor = EnhancedPoseExtractor(config_path)
         
         # Statistics
@@ -66,7 +83,11 @@ class RealTimeProcessor:
             'quality_threshold': 0.4,
             'enable_frame_skipping': True,
             'max_processing_time_ms': 500,
-            'enable_quality_filtering': True
+            'enable_quality_filtering': True,
+            # Streamed JPEG downscale factor (1, 2, 4 or 8); None picks it from the first frame
+            'decode_downscale': None,
+            # Frames per second to analyze in process_video_stream; None analyzes every frame
+            'target_fps': None
         }
         
         if config_path and os.path.exists(config_path):
@@ -84,6 +105,7 @@ class RealTimeProcessor:
         try:
             start_time = time.time()
             self.frame_counter += 1
+            self._update_fps(start_time)
             
             # Convert frame to pose data
             pose_result = self._extract_pose_from_frame(frame_data)
@@ -106,14 +128,14 @@ class RealTimeProcessor:
             time_since_last = current_time - self.last_prediction_time
             
             should_predict = (
-                len(self.pose_buffer) >= self.min_frames_for_prediction and
+                self._count >= self.min_frames_for_prediction and
                 time_since_last >= self.prediction_interval
             )
             
             result = {
                 'success': True,
                 'frame_id': self.frame_counter,
-                'buffer_size': len(self.pose_buffer),
+                'buffer_size': self._count,
                 'quality_score': quality_score,
                 'processing_time_ms': (time.time() - start_time) * 1000,
                 'prediction_ready': should_predict
@@ -140,16 +162,8 @@ class RealTimeProcessor:
     def _extract_pose_from_frame(self, frame: np.ndarray) -> Dict:
         """Extract pose features from a single frame"""
         try:
-            # Save frame temporarily for pose extraction
-            temp_frame_path = f"/tmp/temp_frame_{self.frame_counter}.jpg"
-            cv2.imwrite(temp_frame_path, frame)
-            
-            # Extract poses using the enhanced extractor
-            result = self.pose_extractor.process_frame_sequence([temp_frame_path], max_frames=1)
-            
-            # Clean up temporary file
-            if os.path.exists(temp_frame_path):
-                os.remove(temp_frame_path)
+            # Hand the decoded frame straight to the extractor (no temporary JPEG)
+            result = self.pose_extractor.process_frame_array(frame)
             
             if result['success'] and len(result['pose_sequence']) > 0:
                 return {
@@ -169,20 +183,21 @@ class RealTimeProcessor:
                 'error': f"Pose extraction failed: {str(e)}"
             }
     
-    def _add_to_buffer(self, pose_features: List[float], quality_score: float):
-        """Add pose features to the processing buffer"""
-        self.pose_buffer.append(pose_features)
-        self.quality_scores.append(quality_score)
-        
-        # Maintain buffer size
-        if len(self.pose_buffer) > self.buffer_size:
-            self.pose_buffer.pop(0)
-            self.quality_scores.pop(0)
+    def _add_to_buffer(self, pose_features: np.ndarray, quality_score: float):
+        """Add pose features to the processing buffer, overwriting the oldest frame when full"""
+        self.pose_buffer[self._head] = pose_features
+        self.quality_scores[self._head] = quality_score
+        self._head = (self._head + 1) % self.buffer_size
+        self._count = min(self._count + 1, self.buffer_size)
+    
+    def _buffer_order(self) -> np.ndarray:
+        """Ring indices of the buffered frames, oldest first"""
+        return (self._head - self._count + np.arange(self._count)) % self.buffer_size
     
     def _make_prediction(self) -> Dict:
         """Make a prediction using current buffer contents"""
         try:
-            if len(self.pose_buffer) < self.min_frames_for_prediction:
+            if self._count < self.min_frames_for_prediction:
                 return {
                     'success': False,
                     'error': 'Insufficient frames for prediction'
@@ -192,15 +207,13 @@ class RealTimeProcessor:
             if self.config.get('enable_quality_filtering', True):
                 filtered_sequence = self._apply_quality_filtering()
             else:
-                filtered_sequence = self.pose_buffer.copy()
-            
-            # Use enhanced sign predictor
-            from enhanced_sign_predictor import EnhancedSignLanguagePredictor
+                filtered_sequence = self.pose_buffer[self._buffer_order()]
             
+            # Use enhanced sign predictor (loaded on the first prediction, then cached)
             script_dir = Path(__file__).parent
             model_path = script_dir / '..' / 'models' / 'bangla_lstm_model.h5'
             
-            predictor = EnhancedSignLanguagePredictor(str(model_path))
+            predictor = get_predictor(str(model_path))
             result = predictor.predict(filtered_sequence)
             
             # Update statistics
@@ -224,45 +237,43 @@ class RealTimeProcessor:
                 'error': f"Prediction failed: {str(e)}"
             }
     
-    def _apply_quality_filtering(self) -> List[List[float]]:
-        """Apply quality filtering to current buffer"""
-        if not self.quality_scores:
-            return self.pose_buffer.copy()
+    def _apply_quality_filtering(self) -> np.ndarray:
+        """Apply quality filtering to current buffer; returns a (T, 288) array in temporal order"""
+        order = self._buffer_order()
+        scores = self.quality_scores[order]
         
         threshold = self.config.get('quality_threshold', 0.4)
+        keep = order[scores >= threshold]
         
-        # Create pairs of (pose, quality) and filter
-        paired_data = list(zip(self.pose_buffer, self.quality_scores))
-        filtered_pairs = [
-            (pose, quality) for pose, quality in paired_data 
-            if quality >= threshold
-        ]
-        
-        # If too few frames pass filter, keep best ones
-        if len(filtered_pairs) < self.min_frames_for_prediction:
-            # Sort by quality and take top frames
-            paired_data.sort(key=lambda x: x[1], reverse=True)
-            filtered_pairs = paired_data[:self.min_frames_for_prediction]
+        # If too few frames pass filter, keep the best ones (still in temporal order)
+        if len(keep) < self.min_frames_for_prediction:
+            best = np.argpartition(scores, -self.min_frames_for_prediction)[-self.min_frames_for_prediction:]
+            best.sort()
+            keep = order[best]
         
-        # Extract just the pose data
-        return [pose for pose, _ in filtered_pairs]
+        return self.pose_buffer[keep]
     
     def reset_buffer(self):
         """Reset the processing buffer"""
-        self.pose_buffer.clear()
-        self.quality_scores.clear()
+        self._head = 0
+        self._count = 0
         self.last_prediction_time = 0
         logger.info("Buffer reset completed")
     
+    def _update_fps(self, now: float):
+        """Fold the interval since the previous frame into an exponential moving average FPS"""
+        if self._last_frame_ts is not None and now > self._last_frame_ts:
+            instant_fps = 1.0 / (now - self._last_frame_ts)
+            if self.stats['average_fps'] == 0:
+                self.stats['average_fps'] = instant_fps
+            else:
+                # Exponential moving average (same weighting as average_confidence)
+                alpha = 0.1
+                self.stats['average_fps'] = alpha * instant_fps + (1 - alpha) * self.stats['average_fps']
+        self._last_frame_ts = now
+    
     def get_stats(self) -> Dict:
         """Get processing statistics"""
-        current_time = time.time()
-        if self.stats['frames_processed'] > 0:
-            # Calculate approximate FPS
-            elapsed_time = current_time - (self.stats.get('start_time', current_time))
-            if elapsed_time > 0:
-                self.stats['average_fps'] = self.stats['frames_processed'] / elapsed_time
-        
         return self.stats.copy()
     
     def process_video_stream(self, video_source: int = 0) -> None:
@@ -272,12 +283,26 @@ class RealTimeProcessor:
             logger.error(f"Cannot open video source: {video_source}")
             return
         
+        # Keep only the newest frame queued so a slow pass does not fall behind the camera
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        
+        # Analyze every stride-th frame; the others are grabbed but never decoded
+        target_fps = self.config.get('target_fps')
+        capture_fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_stride = max(1, round(capture_fps / target_fps)) if target_fps and capture_fps > 0 else 1
+        
         logger.info(f"Starting video stream processing from source: {video_source}")
         self.stats['start_time'] = time.time()
         
         try:
+            grabbed = 0
             while True:
-                ret, frame = cap.read()
+                if not cap.grab():
+                    break
+                grabbed += 1
+                if (grabbed - 1) % frame_stride:
+                    continue
+                ret, frame = cap.retrieve()
                 if not ret:
                     break
                 
@@ -313,7 +338,9 @@ class StreamingAPI:
     """API for real-time streaming integration"""
     
     def __init__(self, config_path: Optional[str] = None):
-        self.processor = RealTimeProcessor(config_path)
+        # Sessions share the cached predictor (get_predictor) and normalization arrays; each
+        # keeps its own pose extractor because Holistic tracking state is per stream
+        self.config_path = config_path
         self.active_sessions = {}
     
     def create_session(self, session_id: str) -> Dict:
@@ -321,10 +348,14 @@ class StreamingAPI:
         if session_id in self.active_sessions:
             return {'success': False, 'error': 'Session already exists'}
         
+        processor = RealTimeProcessor(self.config_path)
+        downscale = processor.config.get('decode_downscale')
         self.active_sessions[session_id] = {
-            'processor': RealTimeProcessor(),
+            'processor': processor,
             'created_at': time.time(),
-            'frame_count': 0
+            'frame_count': 0,
+            # None until the first frame has been decoded at full size
+            'decode_flag': _DECODE_FLAGS[downscale] if downscale else None
         }
         
         return {
@@ -333,24 +364,27 @@ class StreamingAPI:
             'message': 'Session created successfully'
         }
     
-    def process_frame_data(self, session_id: str, frame_data: str) -> Dict:
-        """Process base64 encoded frame data"""
+    def process_frame_data(self, session_id: str, frame_bytes: bytes) -> Dict:
+        """Process one encoded (JPEG/PNG) frame received as raw bytes, e.g. a binary WebSocket message"""
         if session_id not in self.active_sessions:
             return {'success': False, 'error': 'Session not found'}
         
         try:
-            import base64
-            
-            # Decode frame data
-            frame_bytes = base64.b64decode(frame_data)
+            # Decode frame data straight from the received buffer (no copy)
+            session = self.active_sessions[session_id]
             frame_array = np.frombuffer(frame_bytes, dtype=np.uint8)
-            frame = cv2.imdecode(frame_array, cv2.IMREAD_COLOR)
+            frame = cv2.imdecode(frame_array, session['decode_flag'] or cv2.IMREAD_COLOR)
             
             if frame is None:
                 return {'success': False, 'error': 'Invalid frame data'}
             
+            # A stream keeps its resolution: the first frame decides the reduced-size decode
+            # (toward the extractor's 640px working width) for the frames after it
+            if session['decode_flag'] is None:
+                factor = session['processor'].pose_extractor._reduce_factor(frame.shape[1])
+                session['decode_flag'] = _DECODE_FLAGS[factor]
+            
             # Process frame
-            session = self.active_sessions[session_id]
             result = session['processor'].process_frame(frame)
             session['frame_count'] += 1
             
@@ -359,6 +393,16 @@ class StreamingAPI:
         except Exception as e:
             return {'success': False, 'error': f'Frame processing failed: {str(e)}'}
     
+    def process_frame_b64(self, session_id: str, frame_data: str) -> Dict:
+        """Process base64 encoded frame data (text-only clients)"""
+        import base64
+        
+        try:
+            frame_bytes = base64.b64decode(frame_data)
+        except Exception as e:
+            return {'success': False, 'error': f'Frame processing failed: {str(e)}'}
+        return self.process_frame_data(session_id, frame_bytes)
+    
     def get_session_stats(self, session_id: str) -> Dict:
         """Get statistics for a session"""
         if session_id not in self.active_sessions:
@@ -376,9 +420,17 @@ class StreamingAPI:
         if session_id not in self.active_sessions:
             return {'success': False, 'error': 'Session not found'}
         
-        del self.active_sessions[session_id]
+        # Release the session's MediaPipe graphs now rather than whenever it is collected
+        session = self.active_sessions.pop(session_id)
+        session['processor'].pose_extractor.close()
         return {'success': True, 'message': 'Session closed successfully'}
 
+def write_result(result: Dict, prefix: str = ''):
+    """Write one result as a JSON line (orjson with native numpy support when installed)"""
+    from pose_extractor import dumps_result
+    sys.stdout.buffer.write(prefix.encode('utf-8') + dumps_result(result) + b'\n')
+    sys.stdout.buffer.flush()
+
 def main():
     """Command-line interface for real-time processing"""
     if len(sys.argv) < 2:
@@ -423,7 +475,7 @@ def main():
                 return
             
             result = processor.process_frame(frame)
-            print(json.dumps(result, ensure_ascii=False))
+            write_result(result)
             
         elif mode == 'test':
             # Test mode - process sample frames
@@ -434,7 +486,7 @@ def main():
                 # Create a dummy frame
                 test_frame = np.random.randint(0, 255, (480, 640, 3), dtype=np.uint8)
                 result = processor.process_frame(test_frame)
-                print(f"Frame {i+1}: {json.dumps(result, ensure_ascii=False)}")
+                write_result(result, prefix=f"Frame {i+1}: ")
                 time.sleep(0.1)  # Simulate real-time delay
         
         else:
@@ -11,6 +11,7 @@ Enhanced Sign Language Predictor for SilentVoice_BD
 import os
 import sys
 import json
+import base64
 import argparse
 import numpy as np
 import tensorflow as tf
@@ -36,6 +37,7 @@ class EnhancedSignLanguagePredictor:
         self.is_loaded = False
         self.feature_means = None
         self.feature_stds = None
+        self.feature_inv_stds = None
         self.normalization_loaded = False
         self.vocabulary = None
         
@@ -87,7 +89,10 @@ class EnhancedSignLanguagePredictor:
                 self.feature_stds = np.load(stds_path).astype(np.float32)
                 
                 # Ensure no zero standard deviations
-                self.feature_stds = np.where(self.feature_stds == 0, 1e-8, self.feature_stds)
+                self.feature_stds = np.where(self.feature_stds == 0, 1e-8, self.feature_stds).astype(np.float32)
+                
+                # Multiply by the float32 reciprocal instead of dividing every element
+                self.feature_inv_stds = (1.0 / self.feature_stds).astype(np.float32)
                 
                 self.normalization_loaded = True
                 logger.info("✅ Normalization parameters loaded successfully")
@@ -107,6 +112,7 @@ class EnhancedSignLanguagePredictor:
         logger.warning("⚠️ Generating default normalization parameters")
         self.feature_means = np.zeros(self.feature_dim, dtype=np.float32)
         self.feature_stds = np.ones(self.feature_dim, dtype=np.float32)
+        self.feature_inv_stds = np.ones(self.feature_dim, dtype=np.float32)
         self.normalization_loaded = True
         logger.warning("⚠️ Using default normalization - model accuracy may be reduced!")
     
@@ -211,7 +217,7 @@ class EnhancedSignLanguagePredictor:
             logger.debug(f"🔧 Preprocessing sequence: {len(sequence)} frames")
             
             # Input validation
-            if not sequence:
+            if sequence is None or len(sequence) == 0:
                 return None, {"error": "Empty sequence provided"}
             
             # Convert to numpy array
@@ -244,11 +250,12 @@ class EnhancedSignLanguagePredictor:
             }
             
             if self.normalization_loaded and self.config.get('enable_normalization', True):
-                # Apply z-score normalization
-                normalized_data = (data - self.feature_means) / self.feature_stds
+                # Apply z-score normalization in place (data is already a private float32 copy)
+                normalized_data = np.subtract(data, self.feature_means, out=data)
+                np.multiply(normalized_data, self.feature_inv_stds, out=normalized_data)
                 
                 # Clip extreme values to prevent instability
-                normalized_data = np.clip(normalized_data, -5.0, 5.0)
+                np.clip(normalized_data, -5.0, 5.0, out=normalized_data)
                 
                 stats.update({
                     'normalization_applied': True,
@@ -272,7 +279,7 @@ class EnhancedSignLanguagePredictor:
                 padding_needed = self.sequence_length - data.shape[0]
                 if self.normalization_loaded:
                     # Use normalized zero vector
-                    zero_frame = -self.feature_means / self.feature_stds
+                    zero_frame = -self.feature_means * self.feature_inv_stds
                     zero_frame = np.clip(zero_frame, -5.0, 5.0)
                 else:
                     zero_frame = np.zeros(self.feature_dim, dtype=np.float32)
@@ -519,6 +526,10 @@ def main():
                         pose_sequence = data_content
                 elif 'pose_sequence' in input_data:
                     pose_sequence = input_data['pose_sequence']
+                    # Compact pose_extractor output: base64 float16 bytes plus shape
+                    if input_data.get('pose_sequence_dtype') == 'float16' and isinstance(pose_sequence, str):
+                        raw = np.frombuffer(base64.b64decode(pose_sequence), dtype=np.float16)
+                        pose_sequence = raw.reshape(input_data['pose_sequence_shape']).astype(np.float32).tolist()
                 else:
                     raise ValueError("No pose sequence found in input data")
                 
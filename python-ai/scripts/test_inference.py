@@ -1,13 +1,12 @@
 #!/usr/bin/env python3
-import json
 from sign_predictor import SignLanguagePredictor
+from prepare_training_data import load_training_data
 
 # Initialize predictor
 predictor = SignLanguagePredictor()
 
 # Load training data
-with open('../data/training_data.json', 'r') as f:
-    data = json.load(f)
+data = load_training_data('../data/training_data.json')
 
 # Test on the first 5 training samples
 print("Sample │ True Label       │ Predicted Text   │ Confidence")
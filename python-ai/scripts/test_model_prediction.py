@@ -41,10 +41,10 @@ def run_prediction(video_path, apply_normalization=True, topk=5):
     seq = extractor.extract_pose_from_video_file(
         video_path,
         max_frames=30,
-        apply_normalization=apply_normalization
+        apply_normalization=apply_normalization,
+        as_array=True
     )
 
-    seq = np.array(seq)
     if seq.ndim != 2 or seq.shape[1] != 288:
         print(f"[WARN] Unexpected pose shape {seq.shape}; attempting to coerce.")
     pose_list = seq.tolist()  # SignLanguagePredictor expects list of lists
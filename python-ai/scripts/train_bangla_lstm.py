@@ -10,6 +10,7 @@ from sklearn.preprocessing import LabelEncoder
 import os
 import pickle
 import gc
+from prepare_training_data import load_training_data
 
 # Configure TensorFlow for memory efficiency
 tf.config.threading.set_inter_op_parallelism_threads(2)
@@ -29,7 +30,7 @@ class BanglaSignLSTMTrainer:
         
         issues_found = 0
         for i, sequence in enumerate(X[:max_samples_to_check]):
-            if not isinstance(sequence, list):
+            if not isinstance(sequence, (list, np.ndarray)):
                 print(f"Warning: Sequence {i} is not a list: {type(sequence)}")
                 issues_found += 1
                 continue
@@ -41,7 +42,7 @@ class BanglaSignLSTMTrainer:
                 
             # Check frame structure
             for j, frame in enumerate(sequence[:5]):  # Check first 5 frames
-                if not isinstance(frame, list):
+                if not isinstance(frame, (list, np.ndarray)):
                     print(f"Warning: Sequence {i}, frame {j} is not a list: {type(frame)}")
                     issues_found += 1
                     break
@@ -63,8 +64,7 @@ class BanglaSignLSTMTrainer:
         print("Loading training data...")
         
         try:
-            with open(self.data_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            data = load_training_data(self.data_file)
         except FileNotFoundError:
             raise FileNotFoundError(f"Training data file not found: {self.data_file}")
         except json.JSONDecodeError as e:
@@ -142,10 +142,6 @@ class BanglaSignLSTMTrainer:
                     batch_processed.append(zero_sequence)
             
             X_processed.extend(batch_processed)
-            
-            # Periodic garbage collection
-            if batch_start % (batch_size * 5) == 0:
-                gc.collect()
         
         print("Converting to numpy array...")
         try:
@@ -0,0 +1,141 @@
+"""Tests for the wire-format landmark packing in scripts/landmark_packing.py"""
+
+import struct
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from landmark_packing import pack_all, pack_landmarks  # noqa: E402
+
+try:
+    from mediapipe.framework.formats import landmark_pb2
+except ImportError:
+    landmark_pb2 = None
+
+FIELDS = ('x', 'y', 'z', 'visibility', 'presence')
+
+
+class WireLandmarkList:
+    """NormalizedLandmarkList stand-in that serializes like protobuf (proto2, every field set)"""
+
+    def __init__(self, points: np.ndarray, skip_field=None):
+        n_fields = points.shape[1]
+        self.landmark = [types.SimpleNamespace(**dict(zip(FIELDS, map(float, row)))) for row in points]
+        for lm in self.landmark:
+            if n_fields < 4:
+                lm.visibility = 0.0
+        self._records = []
+        for i, row in enumerate(points):
+            # skip_field=(row, field) drops one field from one record, changing its length
+            fields = [f for f in range(n_fields) if skip_field != (i, f)]
+            inner = b''.join(struct.pack('<Bf', ((f + 1) << 3) | 5, row[f]) for f in fields)
+            self._records.append(bytes([0x0A, len(inner)]) + inner)
+
+    def SerializeToString(self) -> bytes:
+        return b''.join(self._records)
+
+
+def make_list(points: np.ndarray, **kwargs):
+    """Real NormalizedLandmarkList when mediapipe is installed, the wire stand-in otherwise"""
+    if landmark_pb2 is None or kwargs:
+        return WireLandmarkList(points, **kwargs)
+    landmark_list = landmark_pb2.NormalizedLandmarkList()
+    for row in points:
+        landmark_list.landmark.add(**dict(zip(FIELDS, map(float, row))))
+    return landmark_list
+
+
+def attribute_loop(landmark_list, n_rows: int, n_cols: int) -> np.ndarray:
+    """Reference result: the per-landmark attribute access pack_landmarks replaces"""
+    out = np.zeros((n_rows, n_cols), dtype=np.float32)
+    for row, lm in zip(out, landmark_list.landmark):
+        row[:] = (lm.x, lm.y, lm.z, lm.visibility or 0.0)[:n_cols]
+    return out
+
+
+def random_points(n_points: int, n_fields: int, seed: int = 0) -> np.ndarray:
+    return np.random.default_rng(seed).random((n_points, n_fields)).astype(np.float32)
+
+
+@pytest.mark.parametrize('n_points,n_fields,n_rows,n_cols', [
+    (21, 3, 21, 3),   # hand: x, y, z
+    (33, 5, 33, 4),   # pose: x, y, z, visibility, presence -> first four
+    (468, 3, 10, 3),  # face: only the first 10 points are packed
+])
+def test_wire_path_matches_attribute_loop(n_points, n_fields, n_rows, n_cols):
+    landmark_list = make_list(random_points(n_points, n_fields))
+    out = np.full((n_rows, n_cols), np.nan, dtype=np.float32)
+
+    pack_landmarks(landmark_list, out)
+
+    np.testing.assert_array_equal(out, attribute_loop(landmark_list, n_rows, n_cols))
+
+
+def test_wire_path_skips_attribute_access():
+    class NoAttributes:
+        def __getattr__(self, name):
+            raise AssertionError(f"landmark.{name} read on the wire path")
+
+    points = random_points(33, 5)
+    landmark_list = WireLandmarkList(points)
+    landmark_list.landmark = [NoAttributes() for _ in points]
+    out = np.zeros((33, 4), dtype=np.float32)
+
+    pack_landmarks(landmark_list, out)
+
+    np.testing.assert_array_equal(out, points[:, :4])
+
+
+def test_layout_mismatch_falls_back_to_attribute_loop():
+    # One record without its z field breaks the fixed stride
+    landmark_list = WireLandmarkList(random_points(21, 3), skip_field=(5, 2))
+    out = np.full((21, 3), np.nan, dtype=np.float32)
+
+    pack_landmarks(landmark_list, out)
+
+    np.testing.assert_array_equal(out, attribute_loop(landmark_list, 21, 3))
+
+
+def test_fewer_landmarks_than_rows_zero_fills():
+    landmark_list = make_list(random_points(5, 3))
+    out = np.full((10, 3), np.nan, dtype=np.float32)
+
+    pack_landmarks(landmark_list, out)
+
+    np.testing.assert_array_equal(out[:5], random_points(5, 3))
+    assert not out[5:].any()
+
+
+def test_landmarks_without_wire_format_use_attribute_loop():
+    # Tasks API results are plain objects with no SerializeToString
+    points = random_points(21, 3)
+    landmark_list = types.SimpleNamespace(landmark=WireLandmarkList(points).landmark)
+    out = np.zeros((21, 3), dtype=np.float32)
+
+    pack_landmarks(landmark_list, out)
+
+    np.testing.assert_array_equal(out, points)
+
+
+def test_pack_all_fills_and_clears_every_group():
+    buf = np.full(288, 7.0, dtype=np.float32)
+    views = (buf[:63].reshape(21, 3), buf[63:126].reshape(21, 3),
+             buf[126:258].reshape(33, 4), buf[258:288].reshape(10, 3))
+    hand = random_points(21, 3, seed=1)
+    pose = random_points(33, 5, seed=2)
+    results = types.SimpleNamespace(left_hand_landmarks=make_list(hand), right_hand_landmarks=None,
+                                    pose_landmarks=make_list(pose),
+                                    face_landmarks=make_list(random_points(5, 3, seed=3)))
+
+    qualities = pack_all(results, views)
+
+    np.testing.assert_array_equal(buf[:63], hand.ravel())
+    np.testing.assert_array_equal(buf[126:258], pose[:, :4].ravel())
+    # Absent right hand and a face with fewer than 10 points are zeroed
+    assert not buf[63:126].any() and not buf[258:].any()
+    assert qualities == (1.0, 0.0, pytest.approx(float(pose[:, 3].mean())), 0.0)